@@ -1,23 +1,34 @@
+import click
 import datetime
+import hashlib
+import heapq
+import io
+import json
 import os
-import matplotlib.pyplot as plt
-import math
-import pandas as pd
+import pickle
 import random
 import smtplib
+import sqlite3
+import time
+import traceback
+from array import array
+from collections import namedtuple, OrderedDict
 from dotenv import load_dotenv
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.mime.image import MIMEImage
-from flask import Flask, flash, render_template, url_for, redirect, request
+from flask import Flask, flash, render_template, url_for, redirect, request, g, has_request_context, jsonify, \
+    abort, send_file
 from flask_bootstrap import Bootstrap
 from flask_login import UserMixin, login_user, LoginManager, current_user
+from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 from flask_wtf import FlaskForm
-from functools import wraps
+from functools import cached_property, wraps
 from math import ceil
-from PIL import Image, ImageDraw, ImageFont
-from sqlalchemy.orm import relationship
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import relationship, selectinload, joinedload, aliased, Session
 from werkzeug.security import check_password_hash
 from wtforms import StringField, SubmitField, IntegerField, SelectField, PasswordField
 from wtforms.validators import DataRequired
@@ -45,11 +56,30 @@ app.jinja_env.globals.update(split=split)
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL')
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQL_QUERY_BUDGET'] = int(os.environ.get('SQL_QUERY_BUDGET', 0))
+app.config['MAIL_BACKEND'] = os.environ.get('MAIL_BACKEND', 'smtp')
+app.config['MAIL_FILE_DIR'] = os.environ.get('MAIL_FILE_DIR', 'sent-mail')
+app.config['RENDER_CACHE_DIR'] = os.environ.get('RENDER_CACHE_DIR', 'render-cache')
+app.config['RENDER_CACHE_MAX_BYTES'] = int(os.environ.get('RENDER_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+# Size of the emailed charts, one of reporting.CHART_PROFILES: email, social or print
+app.config['CHART_PROFILE'] = os.environ.get('CHART_PROFILE', 'email')
+# "memory" is filled by each worker on its own; "filesystem" and "sqlite" are shared by every worker on the machine
+app.config['CACHE_BACKEND'] = os.environ.get('CACHE_BACKEND', 'memory')
+# Seconds a "memory" cache entry is kept, however rarely ladder data changes
+app.config['CACHE_TTL'] = int(os.environ.get('CACHE_TTL', 300))
+app.config['CACHE_PATH'] = os.environ.get('CACHE_PATH', 'page-cache')
+app.config['CACHE_MAX_ENTRIES'] = int(os.environ.get('CACHE_MAX_ENTRIES', 256))
 db = SQLAlchemy(app)
+migrate = Migrate(app, db)
 USERNAME = os.environ.get('LASUSTENNIS_USERNAME')
 PASSWORD = os.environ.get('LASUSTENNIS_PASSWORD')
 EMAIL_PASSWORD = os.environ.get('EMAIL_PASSWORD')
-COLORS = ['#FFF200', '#F7FF00', '#E1FF00', '#CCFF00', '#B7FF00', '#A2FF00', '#8CFF00']
+SMTP_SERVER = 'smtp.gmail.com'
+SMTP_PORT = 587
+CLUB_EMAIL = 'lasustennis@gmail.com'
+JOB_RETRY_DELAY = 60
+# Bump whenever the results or table drawing code changes so cached images are redrawn
+RENDER_VERSION = 1
 
 
 def admin_only(f):
@@ -70,8 +100,14 @@ class User(UserMixin, db.Model):
 
 class PlayerMatch(db.Model):
     __tablename__ = "player_match"
+    __table_args__ = (db.Index('ix_player_match_match_id_side_slot', 'match_id', 'side', 'slot'),)
     player_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    player = relationship("Player", back_populates="participations")
     match_id = db.Column(db.Integer, db.ForeignKey('match.id'), primary_key=True)
+    match = relationship("Match", back_populates="participants")
+    # The team (1 or 2) the player was on, and their place within it, as in Match.players_order
+    side = db.Column(db.Integer)
+    slot = db.Column(db.Integer)
 
 
 class Player(db.Model):
@@ -80,7 +116,8 @@ class Player(db.Model):
     name = db.Column(db.String(250), unique=True, nullable=False)
     full_name = db.Column(db.String(250), unique=True, nullable=False)
     rank = db.Column(db.Integer)
-    matches = relationship("Match", secondary="player_match", back_populates="players")
+    matches = relationship("Match", secondary="player_match", back_populates="players", viewonly=True)
+    participations = relationship("PlayerMatch", back_populates="player")
     points = db.Column(db.Integer, nullable=False)
     challenge_points = db.Column(db.Integer, nullable=False)
     challenge_matches = db.Column(db.Integer, nullable=False)
@@ -91,7 +128,9 @@ class Player(db.Model):
 class Match(db.Model):
     __tablename__ = "match"
     id = db.Column(db.Integer, primary_key=True)
-    players = relationship("Player", secondary="player_match", back_populates="matches")
+    players = relationship("Player", secondary="player_match", back_populates="matches", viewonly=True)
+    participants = relationship("PlayerMatch", back_populates="match", cascade="all, delete-orphan",
+                                order_by="(PlayerMatch.side, PlayerMatch.slot)")
     players_order = db.Column(db.String(250), nullable=False)
     score1 = db.Column(db.Integer, nullable=False)
     score2 = db.Column(db.Integer, nullable=False)
@@ -100,17 +139,18 @@ class Match(db.Model):
     set3_score1 = db.Column(db.Integer)
     set3_score2 = db.Column(db.Integer)
     week = relationship("Week", back_populates="matches")
-    week_id = db.Column(db.Integer, db.ForeignKey('week.id'))
+    week_id = db.Column(db.Integer, db.ForeignKey('week.id'), index=True)
     is_challenge = db.Column(db.Boolean, nullable=False)
     points_gained = db.Column(db.Integer)
 
 
 class Week(db.Model):
     __tablename__ = "week"
+    __table_args__ = (db.Index('ix_week_number_year_id', 'number', 'year_id'),)
     id = db.Column(db.Integer, primary_key=True)
     number = db.Column(db.Integer, nullable=False)
     first_saturday = db.Column(db.String(250), nullable=False)
-    matches = relationship("Match", back_populates="week")
+    matches = relationship("Match", back_populates="week", order_by="Match.id")
     year = relationship("Year", back_populates="weeks")
     year_id = db.Column(db.Integer, db.ForeignKey('year.id'))
 
@@ -119,11 +159,434 @@ class Year(db.Model):
     __tablename__ = "year"
     id = db.Column(db.Integer, primary_key=True)
     year = db.Column(db.Integer, unique=True)
-    weeks = relationship("Week", back_populates="year")
+    weeks = relationship("Week", back_populates="year", order_by="Week.id")
+
+
+class PairStat(db.Model):
+    """Head-to-head record of two players, stored once per pair with the lower player id first."""
+    __tablename__ = "pair_stat"
+    player1_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    player2_id = db.Column(db.Integer, db.ForeignKey('player.id'), primary_key=True)
+    singles_played = db.Column(db.Integer, nullable=False, default=0)
+    singles_won1 = db.Column(db.Integer, nullable=False, default=0)
+    singles_won2 = db.Column(db.Integer, nullable=False, default=0)
+    doubles_played = db.Column(db.Integer, nullable=False, default=0)
+    doubles_won1 = db.Column(db.Integer, nullable=False, default=0)
+    doubles_won2 = db.Column(db.Integer, nullable=False, default=0)
+    teammates_played = db.Column(db.Integer, nullable=False, default=0)
+    teammates_won = db.Column(db.Integer, nullable=False, default=0)
+
+
+class Standing(db.Model):
+    __tablename__ = "standing"
+    __table_args__ = (db.UniqueConstraint('year_id', 'day', 'player_id'),)
+    id = db.Column(db.Integer, primary_key=True)
+    year = relationship("Year")
+    year_id = db.Column(db.Integer, db.ForeignKey('year.id'), nullable=False)
+    day = db.Column(db.Integer, nullable=False)
+    player = relationship("Player")
+    player_id = db.Column(db.Integer, db.ForeignKey('player.id'), nullable=False)
+    points = db.Column(db.Integer, nullable=False)
+    games = db.Column(db.Integer, nullable=False)
+    position = db.Column(db.Integer, nullable=False)
+    shift = db.Column(db.Integer, nullable=False)
+
+
+class SeasonArchive(db.Model):
+    """The ladder games page of a finished season, frozen as JSON so viewing it later is a single read."""
+    __tablename__ = "season_archive"
+    id = db.Column(db.Integer, primary_key=True)
+    year = relationship("Year")
+    year_id = db.Column(db.Integer, db.ForeignKey('year.id'), unique=True, nullable=False)
+    data = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+
+class Job(db.Model):
+    """An email or report queued by a request handler and run later by the ``run-jobs`` worker."""
+    __tablename__ = "job"
+    __table_args__ = (db.Index('ix_job_status_run_at', 'status', 'run_at'),)
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=5)
+    last_error = db.Column(db.Text)
+    run_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False)
+
+
+class DataVersion(db.Model):
+    """A single row counting the commits that changed ladder data. It is bumped in the writing transaction itself,
+    so every worker and CLI command agrees on which cached results are still current."""
+    __tablename__ = "data_version"
+    id = db.Column(db.Integer, primary_key=True)
+    value = db.Column(db.Integer, nullable=False)
+
+
+event.listen(DataVersion.__table__, "after_create", db.DDL("INSERT INTO data_version (id, value) VALUES (1, 0)"))
+
+
+# Queries
+# Each view loads the relationships it touches up front, so rendering never lazy loads one row at a time.
+def query_matches_with_players():
+    return Match.query.options(
+        selectinload(Match.participants).joinedload(PlayerMatch.player),
+        joinedload(Match.week).joinedload(Week.year)
+    )
+
+
+def query_match_page(cursor=None, limit=50, year=None):
+    """One page of matches, newest day first and newest match first within a day, as (matches, next cursor).
+
+    Pages are keyset-paginated on (week id, match id): ``cursor`` is the key of the last match already shown, so
+    every page costs the same however far back it is. The next cursor is None on the last page.
+    """
+    query = query_matches_with_players()
+    if year is not None:
+        query = query.filter(Match.week.has(Week.year.has(Year.year == year)))
+    if cursor is not None:
+        week_id, match_id = cursor
+        query = query.filter(db.or_(Match.week_id < week_id, db.and_(Match.week_id == week_id, Match.id < match_id)))
+    matches = query.order_by(Match.week_id.desc(), Match.id.desc()).limit(limit + 1).all()
+    if len(matches) > limit:
+        last = matches[limit - 1]
+        return matches[:limit], (last.week_id, last.id)
+    return matches, None
+
+
+def query_day_page(year, before=None, limit=4):
+    """Up to ``limit`` days of a season with their matches, newest first, as (weeks, next ``before``).
+
+    Keyset-paginated on the day number: ``before`` is the oldest day already shown, and the next one is None on
+    the last page.
+    """
+    query = query_week_with_matches().filter(Week.year_id == year.id)
+    if before is not None:
+        query = query.filter(Week.number < before)
+    weeks = query.order_by(Week.number.desc()).limit(limit + 1).all()
+    if len(weeks) > limit:
+        return weeks[:limit], weeks[limit - 1].number
+    return weeks, None
+
+
+def format_match_cursor(cursor):
+    return f"{cursor[0]}-{cursor[1]}" if cursor else None
+
+
+def parse_match_cursor(value):
+    """Reads a cursor made by ``format_match_cursor``, aborting with 400 if it was tampered with."""
+    if not value:
+        return None
+    try:
+        week_id, match_id = value.split("-")
+        return int(week_id), int(match_id)
+    except ValueError:
+        abort(400)
+
+
+def query_week_with_matches():
+    return Week.query.options(selectinload(Week.matches).selectinload(Match.participants).joinedload(PlayerMatch.player))
+
+
+def get_week(number, year=None):
+    """Day ``number`` of a season (the current one by default)."""
+    if year is None:
+        year = datetime.datetime.now().year
+    return Week.query.join(Year, Week.year_id == Year.id).filter(Week.number == number, Year.year == year).first()
+
+
+def query_year_weeks(year=None):
+    if year is None:
+        year = datetime.datetime.now().year
+    return Week.query.join(Year, Week.year_id == Year.id).filter(Year.year == year).order_by(Week.id)
+
+
+def query_season_weeks(year):
+    return query_week_with_matches().filter(Week.year_id == year.id).order_by(Week.id)
+
+
+def query_standings(year, day):
+    return Standing.query.options(joinedload(Standing.player)) \
+        .filter_by(year_id=year.id, day=day) \
+        .order_by(Standing.position, Standing.player_id.desc())
+
+
+class SeasonContext:
+    """The rows of a season that several stats and views of one request need, each loaded on first use and then
+    shared. Get it through ``get_season()``."""
+
+    def __init__(self, year_number):
+        self.year_number = year_number
+
+    @cached_property
+    def year(self):
+        return Year.query.filter_by(year=self.year_number).first()
+
+    @cached_property
+    def weeks(self):
+        return query_season_weeks(self.year).all() if self.year else []
+
+    @cached_property
+    def players(self):
+        return Player.query.all()
+
+    @cached_property
+    def players_by_points(self):
+        """The roster from most to fewest points, as ``Player.query.order_by(Player.points).all()[::-1]``."""
+        return sorted(self.players, key=lambda player: (player.points, player.id), reverse=True)
+
+    @cached_property
+    def aggregate(self):
+        return load_season_aggregate(self.year_number, self.players)
+
+
+def get_season(year=None):
+    """The SeasonContext of ``year`` (the current one by default), kept on ``flask.g`` for the rest of the request.
+    Outside a request every call loads afresh."""
+    if year is None:
+        year = datetime.datetime.now().year
+    if not has_request_context():
+        return SeasonContext(year)
+    seasons = g.setdefault("seasons", {})
+    if year not in seasons:
+        seasons[year] = SeasonContext(year)
+    return seasons[year]
+
+
+@event.listens_for(Session, "after_commit")
+def forget_seasons(session):
+    # Whatever was loaded before a commit may be out of date after it
+    if has_request_context():
+        g.pop("seasons", None)
+        g.pop("data_version", None)
+
+
+# Cross-request cache
+# Entries are keyed by the DataVersion that every commit touching ladder data bumps, so nothing is ever invalidated
+# explicitly: old versions stop being asked for and get evicted as least recently used.
+class MemoryCache:
+    """Cache held in this process, so each worker fills its own. Entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        if key not in self.entries:
+            return None
+        expires, value = self.entries[key]
+        if expires < time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key, value):
+        self.entries[key] = (time.monotonic() + self.ttl, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
 
+class FileCache:
+    """Cache kept as pickle files in ``directory``, shared by every worker that points at it."""
 
-# with app.app_context():
-#     db.create_all()
+    def __init__(self, directory, max_entries):
+        self.directory = directory
+        self.max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{hashlib.sha256(key.encode()).hexdigest()}.pickle")
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                value = pickle.load(f)
+            os.utime(path)
+            return value
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, value):
+        path = self.path(key)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(value, f)
+        os.replace(temp_path, path)
+        entries = sorted((entry.stat().st_mtime, entry.path) for entry in os.scandir(self.directory)
+                         if entry.name.endswith(".pickle"))
+        for _, old_path in entries[:max(len(entries) - self.max_entries, 0)]:
+            try:
+                os.remove(old_path)
+            except FileNotFoundError:
+                pass
+
+
+class SQLiteCache:
+    """Cache kept in an SQLite file, shared by every worker that points at it."""
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        with self.connect() as connection:
+            connection.execute("CREATE TABLE IF NOT EXISTS entry (key TEXT PRIMARY KEY, value BLOB, used REAL)")
+
+    def connect(self):
+        return sqlite3.connect(self.path, timeout=10)
+
+    def get(self, key):
+        with self.connect() as connection:
+            row = connection.execute("SELECT value FROM entry WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            connection.execute("UPDATE entry SET used = ? WHERE key = ?", (time.time(), key))
+        return pickle.loads(row[0])
+
+    def set(self, key, value):
+        with self.connect() as connection:
+            connection.execute("INSERT OR REPLACE INTO entry VALUES (?, ?, ?)", (key, pickle.dumps(value), time.time()))
+            connection.execute("DELETE FROM entry WHERE key NOT IN (SELECT key FROM entry ORDER BY used DESC LIMIT ?)",
+                               (self.max_entries,))
+
+
+CACHE_BACKENDS = {
+    "memory": lambda: MemoryCache(app.config['CACHE_MAX_ENTRIES'], app.config['CACHE_TTL']),
+    "filesystem": lambda: FileCache(app.config['CACHE_PATH'], app.config['CACHE_MAX_ENTRIES']),
+    "sqlite": lambda: SQLiteCache(app.config['CACHE_PATH'], app.config['CACHE_MAX_ENTRIES'])
+}
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = CACHE_BACKENDS[app.config['CACHE_BACKEND']]()
+    return _cache
+
+
+def get_data_version():
+    """The current DataVersion, read once per request."""
+    if has_request_context() and "data_version" in g:
+        return g.data_version
+    version = db.session.execute(db.select(DataVersion.value).filter_by(id=1)).scalar() or 0
+    if has_request_context():
+        g.data_version = version
+    return version
+
+
+def cached(name, compute):
+    """Returns ``compute()``, reusing the result stored for ``name`` while the data version is unchanged."""
+    cache = get_cache()
+    key = f"{get_data_version()}:{name}"
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value)
+    return value
+
+
+LADDER_MODELS = ("Player", "Match", "PlayerMatch", "Week", "Year", "Standing")
+
+
+@event.listens_for(Session, "after_flush")
+def bump_data_version(session, flush_context):
+    # Bumped once per transaction, and committed or rolled back along with the change itself
+    if session.info.get("data_version_bumped"):
+        return
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if type(instance).__name__ in LADDER_MODELS:
+            session.connection().execute(db.update(DataVersion).filter_by(id=1).values(value=DataVersion.value + 1))
+            session.info["data_version_bumped"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def end_data_version_bump(session):
+    session.info.pop("data_version_bumped", None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.query_count = g.get("query_count", 0) + 1
+
+
+@app.after_request
+def check_query_budget(response):
+    """With SQL_QUERY_BUDGET set, reports the statements each request ran in an X-Query-Count header and logs a
+    warning for requests that go over it. tests/test_query_counts.py holds the per-view budgets."""
+    budget = app.config.get("SQL_QUERY_BUDGET")
+    if budget:
+        query_count = g.get("query_count", 0)
+        response.headers["X-Query-Count"] = str(query_count)
+        if query_count > budget:
+            app.logger.warning(f"{request.method} {request.path} ran {query_count} SQL statements (budget {budget})")
+    return response
+
+
+@app.cli.command("run-jobs")
+@click.option("--once", is_flag=True, help="Exit when the queue is empty instead of waiting for new jobs.")
+@click.option("--interval", default=5.0, help="Seconds to wait before polling an empty queue again.")
+def run_jobs(once, interval):
+    """Works through the queued emails and reports."""
+    while True:
+        job = claim_next_job()
+        if job is None:
+            # Don't hold the SMTP connection open while the queue is idle
+            get_mail_transport().close()
+            if once:
+                break
+            time.sleep(interval)
+            continue
+        run_job(job)
+
+
+@app.cli.command("rebuild-pair-stats")
+@click.option("--if-empty", is_flag=True, help="Leave the records alone if there are any already.")
+def rebuild_pair_stats(if_empty):
+    """Recomputes every pair's head-to-head record from scratch."""
+    if if_empty and PairStat.query.first() is not None:
+        return
+    # Summed here and written once per pair: update_pair_stats() sets each counter to an SQL expression, and a
+    # second match of the same pair before a flush would overwrite the first one's
+    totals = {}
+    for match in Match.query.options(selectinload(Match.participants).joinedload(PlayerMatch.player)):
+        for pair, changes in get_pair_deltas(match).items():
+            counts = totals.setdefault(pair, dict.fromkeys(PAIR_STAT_COUNTERS, 0))
+            for counter, change in changes.items():
+                counts[counter] += change
+    PairStat.query.delete()
+    for (player1_id, player2_id), counts in totals.items():
+        db.session.add(PairStat(player1_id=player1_id, player2_id=player2_id, **counts))
+    db.session.commit()
+
+
+@app.cli.command("archive-season")
+@click.argument("year", type=int)
+def archive_season_command(year):
+    """Freezes a finished season's standings and leaderboards (again, if it was already archived)."""
+    if archive_season(year) is None:
+        raise click.ClickException(f"There is no {year} season")
+
+
+@app.cli.command("rebuild-standings")
+@click.argument("year", type=int, required=False)
+@click.option("--missing", is_flag=True, help="Instead, write the standings of every season that has none yet.")
+def rebuild_standings(year, missing):
+    """Recomputes a season's standings (the current one by default)."""
+    if not missing:
+        refresh_standings(year)
+        return
+    written = db.session.query(Standing.year_id)
+    for season in Year.query.filter(Year.id.not_in(written)).order_by(Year.year).all():
+        refresh_standings(season.year)
 
 
 # Forms
@@ -185,633 +648,771 @@ class HeadToHeadForm(FlaskForm):
     player_2 = SelectField("Player 2", default=None, validators=[DataRequired()])
 
 
-def send_member_request(name, phone_no, experience):
-    smtp_server = 'smtp.gmail.com'
-    smtp_port = 587
-    smtp_username = 'lasustennis@gmail.com'
-    smtp_password = EMAIL_PASSWORD
-
-    server = smtplib.SMTP(smtp_server, smtp_port)
-    server.starttls()
-    server.login(smtp_username, smtp_password)
+class MailTransport:
+    """Sends the club's emails over one SMTP connection, opened on first use and kept alive between sends so a
+    worker working through several jobs only logs in once."""
+
+    def __init__(self, host, port, username, password, recipient):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.recipient = recipient
+        self.connection = None
+
+    def build_message(self, subject, body='', attachments=()):
+        message = MIMEMultipart()
+        message['From'] = self.username
+        message['To'] = self.recipient
+        message['Subject'] = subject
+        if body:
+            message.attach(MIMEText(body, 'plain'))
+        for filename, data in attachments:
+            message.attach(MIMEImage(data, name=filename))
+        return message
+
+    def connect(self):
+        connection = smtplib.SMTP(self.host, self.port)
+        connection.starttls()
+        connection.login(self.username, self.password)
+        return connection
+
+    def send(self, subject, body='', attachments=()):
+        """Sends one email. ``attachments`` is a list of (filename, PNG bytes) pairs."""
+        message = self.build_message(subject, body, attachments).as_string()
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = self.connect()
+            try:
+                self.connection.sendmail(self.username, self.recipient, message)
+                return
+            except (smtplib.SMTPServerDisconnected, ConnectionError):
+                # The server closed the idle connection, reconnect once and try again
+                self.connection = None
+                if attempt:
+                    raise
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.quit()
+            except smtplib.SMTPException:
+                pass
+            self.connection = None
+
+
+class FileMailTransport(MailTransport):
+    """Writes every email to an .eml file in ``directory`` instead of sending it, for local runs and tests."""
+
+    def __init__(self, directory, username, recipient):
+        super().__init__(None, None, username, None, recipient)
+        self.directory = directory
+
+    def send(self, subject, body='', attachments=()):
+        os.makedirs(self.directory, exist_ok=True)
+        slug = ''.join(c if c.isalnum() else '_' for c in subject.lower())
+        filename = f"{datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{slug}.eml"
+        with open(os.path.join(self.directory, filename), 'w') as f:
+            f.write(self.build_message(subject, body, attachments).as_string())
+
+
+_mail_transport = None
+
+
+def get_mail_transport():
+    global _mail_transport
+    if _mail_transport is None:
+        if app.config['MAIL_BACKEND'] == 'file':
+            _mail_transport = FileMailTransport(app.config['MAIL_FILE_DIR'], CLUB_EMAIL, CLUB_EMAIL)
+        else:
+            _mail_transport = MailTransport(SMTP_SERVER, SMTP_PORT, CLUB_EMAIL, EMAIL_PASSWORD, CLUB_EMAIL)
+    return _mail_transport
 
-    message = MIMEMultipart()
-    message['From'] = smtp_username
-    message['To'] = 'lasustennis@gmail.com'
-    message['Subject'] = 'New Member Request!!!'
 
+def send_member_request(name, phone_no, experience):
     body = f'{name} wants to become a member of LASUSTENNIS CLUB.\n' \
            f'Phone Number: 0{phone_no}\nLevel of experience: {experience}'
-    message.attach(MIMEText(body, 'plain'))
+    get_mail_transport().send('New Member Request!!!', body)
 
-    server.sendmail(smtp_username, 'lasustennis@gmail.com', message.as_string())
-    server.quit()
 
+class RenderCache:
+    """Keeps rendered PNGs on disk under a hash of the data they were drawn from, so an image is only redrawn when
+    its data changes. The least recently used files are removed once the directory grows past ``max_bytes``."""
 
-def send_stat(stat: dict, title: str):
-    plt.figure(figsize=(16, 10), facecolor=random.choice(COLORS))
-    plt.xticks(fontsize=15, rotation=15)
-    plt.yticks(fontsize=20)
-    plt.title(title, fontsize=25)
-    dic = {}
-    n = 0
-    for i in stat:
-        n = n + 1
-        if n == 5:
-            fifth = stat[i]
-    n = 0
-    for i in stat:
-        if n > 5:
-            if stat[i] == fifth:
-                dic[i] = stat[i]
-            else:
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def key(self, kind, data):
+        content = json.dumps([kind, RENDER_VERSION, data], default=str)
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def get_or_render(self, kind, data, render):
+        path = os.path.join(self.directory, f"{kind}-{self.key(kind, data)}.png")
+        try:
+            with open(path, "rb") as f:
+                png = f.read()
+            os.utime(path)
+            return png
+        except FileNotFoundError:
+            pass
+        png = render()
+        os.makedirs(self.directory, exist_ok=True)
+        # Write under a temporary name first so another worker never reads a half-written file
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(png)
+        os.replace(temp_path, path)
+        self.evict()
+        return png
+
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".png"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
                 break
-        dic[i] = stat[i]
-        n = n + 1
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
 
-    for player in dic:
-        bar = plt.bar(player, height=dic[player], color='#000000')
-        plt.bar_label(bar, padding=3, fontsize=20)
-    plt.savefig('stat.png', dpi=1000)
+render_cache = RenderCache(app.config['RENDER_CACHE_DIR'], app.config['RENDER_CACHE_MAX_BYTES'])
 
-    smtp_server = 'smtp.gmail.com'
-    smtp_port = 587
-    smtp_username = 'lasustennis@gmail.com'
-    smtp_password = EMAIL_PASSWORD
 
-    server = smtplib.SMTP(smtp_server, smtp_port)
-    server.starttls()
-    server.login(smtp_username, smtp_password)
+def stat_filename(title):
+    return f'{title.lower().replace(" ", "_")}.png'
+
+
+def send_stat(stat: dict, title: str):
+    import reporting
+    chart = reporting.render_stat(stat, title, app.config['CHART_PROFILE'])
+    get_mail_transport().send(title, attachments=[(stat_filename(title), chart)])
 
-    message = MIMEMultipart()
-    message['From'] = smtp_username
-    message['To'] = 'lasustennis@gmail.com'
-    message['Subject'] = title
 
-    body = ''
-    message.attach(MIMEText(body, 'plain'))
+def get_cwp_series(year=None):
+    """Every player's cumulative points from Day 0 of a season, in ladder order."""
+    series = get_cumulative_standings(year)["points"].series
+    return {player.name: series[player.name] for player in get_season(year).players_by_points}
 
-    with open('stat.png', 'rb') as f:
-        img_data = f.read()
-        image = MIMEImage(img_data, name=f'{title.lower().replace(" ", "_")}.png')
-        message.attach(image)
 
-    server.sendmail(smtp_username, 'lasustennis@gmail.com', message.as_string())
-    server.quit()
+def render_cwp(profile=None, year=None):
+    import reporting
+    return reporting.render_cwp(get_cwp_series(year), profile or app.config['CHART_PROFILE'])
 
 
 def send_cwp():
-    weekly_points = get_weekly_points()
-    players_in_order = Player.query.order_by(Player.points).all()[::-1]
-    cumulative_weekly_points = {"": [0 for _ in players_in_order]}
-    for i in range(1, len(weekly_points) + 1):
-        cumulative_weekly_points[f"Day {i}"] = [0 for i in range(len(weekly_points[f"Day {i}"]))]
-        for j in range(1, i + 1):
-            for k in range(len(cumulative_weekly_points[f"Day {i}"])):
-                cumulative_weekly_points[f"Day {i}"][k] += weekly_points[f"Day {j}"][players_in_order[k].name]
-    df = pd.DataFrame.from_dict(
-        cumulative_weekly_points,
-        orient='index',
-        columns=[player.name for player in players_in_order]
-    )
-    plt.figure(figsize=(16, 10), facecolor=random.choice(COLORS))
-    plt.xticks(fontsize=20)
-    plt.yticks(fontsize=20)
-    plt.xlabel('Weeks', fontsize=25)
-    plt.ylabel('Points', fontsize=25)
-    plt.plot(df.index, df, linewidth=3)
-    plt.xlim(left=0)
-    plt.ylim(bottom=0)
-    plt.legend(df.columns, fontsize=17)
-    plt.savefig('cwp.png', dpi=1000)
-
-    smtp_server = 'smtp.gmail.com'
-    smtp_port = 587
-    smtp_username = 'lasustennis@gmail.com'
-    smtp_password = EMAIL_PASSWORD
-
-    server = smtplib.SMTP(smtp_server, smtp_port)
-    server.starttls()
-    server.login(smtp_username, smtp_password)
-
-    message = MIMEMultipart()
-    message['From'] = smtp_username
-    message['To'] = 'lasustennis@gmail.com'
-    message['Subject'] = 'CUMULATIVE WEEKLY POINTS'
-
-    with open('cwp.png', 'rb') as f:
-        img_data = f.read()
-        image = MIMEImage(img_data, name='cwp.png')
-        message.attach(image)
-
-    server.sendmail(smtp_username, 'lasustennis@gmail.com', message.as_string())
-    server.quit()
-
-
-def send_week_result(number):
-    week = Week.query.filter_by(number=number).first()
-    results = ""
-    for match in week.matches:
-        match_players = match.players_order.split()
-        if not match.is_challenge:
-            if len(match.players) == 4:
-                results = results + f"{match_players[0]}/{match_players[1]} {match.score1} - {match.score2} {match_players[2]}/{match_players[3]}\n\n"
-            elif len(match.players) == 2:
-                results = results + f"{match_players[0]} {match.score1} - {match.score2} {match_players[1]}\n\n"
-
-    if len(week.matches) < 20:
-        img = Image.new('RGB', (800, 1200), (255, 255, 255))
-    else:
-        img = Image.new('RGB', (800 + (34 * (len(week.matches) - 19)), 1200 + (51 * (len(week.matches) - 19))), (255, 255, 255))
-    draw = ImageDraw.Draw(img)
-    w, h = img.size
-
-    from_color = (69, 255, 0)
-    to_color = (255, 242, 0)
-    angle = math.pi * 0 / 180
-
-    for y in range(img.height):
-        for x in range(img.width):
-            frac = (math.cos(angle) * x + math.sin(angle) * y) / img.width
-            color = (
-                int(from_color[0] * (1 - frac) + to_color[0] * frac),
-                int(from_color[1] * (1 - frac) + to_color[1] * frac),
-                int(from_color[2] * (1 - frac) + to_color[2] * frac)
-            )
-            draw.point((x, y), fill=color)
-
-    # Heading
-    text = f"DAY {number} LADDER GAMES"
-    heading = ImageFont.truetype("fonts/RadikalTrial-Black-BF642254c139184.otf", 50)
-    text_width, text_height = draw.textsize(text, font=heading)
-    text_x = (w // 2) - text_width // 2
-    text_y = 100 - text_height // 2
-    draw.text((text_x, text_y), text=text, fill=(0, 0, 0), font=heading)
-
-    # Matches
-    for i in range(len(week.matches)):
-        match = week.matches[i]
-        match_players = match.players_order.split()
-        if not match.is_challenge:
-            draw.rectangle((((w // 8), 200 + (i * 50)), ((w - (w // 8)), 244 + (i * 50))), fill=(255, 255, 255))
-            draw.rectangle(((((w // 2) - 38), 200 + (i * 50)), (((w // 2) + 38), 244 + (i * 50))), fill=(0, 0, 0))
-
-            score_font = ImageFont.truetype("fonts/arialbd.ttf", 24)
-            score = f"{match.score1} - {match.score2}"
-            score_w, score_h = draw.textsize(score, font=score_font)
-            score_x = (w // 2) - score_w // 2
-            score_y = (222 + (i * 50)) - score_h // 2
-            draw.text((score_x, score_y), text=score, fill=(255, 255, 255), font=score_font)
-
-            font = ImageFont.truetype("fonts/RadikalTrial-Medium-BF642254c12fd7b.otf", 24)
-            if len(match_players) == 4:
-                left = f'{match_players[0]}  {match_players[1]}'
-                right = f'{match_players[2]} {match_players[3]}'
-            else:
-                left = match_players[0]
-                right = match_players[1]
-
-            left_w, left_h = draw.textsize(left, font=font)
-            left_x = ((w // 2) - 50) - left_w
-            left_contains_bottom = 'g' in left or 'j' in left or 'p' in left or 'q' in left or 'y' in left
-            if left_contains_bottom:
-                left_y = (222 + (i * 50)) - left_h // 2
-            else:
-                left_y = (233 + (i * 50)) - left_h
-            draw.text((left_x, left_y), text=left, fill=(0, 0, 0), font=font)
+    get_mail_transport().send('CUMULATIVE WEEKLY POINTS', attachments=[render_report('cwp')])
 
-            right_h = draw.textsize(right, font=font)[1]
-            right_contains_bottom = 'g' in right or 'j' in right or 'p' in right or 'q' in right or 'y' in right
-            if right_contains_bottom:
-                right_y = (222 + (i * 50)) - right_h // 2
-            else:
-                right_y = (233 + (i * 50)) - right_h
-            draw.text((((w // 2) + 50), right_y), text=right, fill=(0, 0, 0), font=font)
-
-            if len(match_players) == 4:
-                slash = '/'
-                l_slash_w, l_slash_h = draw.textsize(slash, font=score_font)
-                size1 = draw.textsize(match_players[1], font=font)[0]
-                l_slash_x = ((w // 2) - 50) - (size1 + l_slash_w)
-                if left_contains_bottom:
-                    l_slash_y = (222 + (i * 50)) - l_slash_h // 2
-                else:
-                    l_slash_y = (233 + (i * 50)) - l_slash_h
-                draw.text((l_slash_x, l_slash_y), text=slash, fill=(0, 0, 0), font=score_font)
-
-                r_slash_h = draw.textsize(slash, font=score_font)[1]
-                size2 = draw.textsize(match_players[2], font=font)[0]
-                r_slash_x = ((w // 2) + 50) + size2
-                if right_contains_bottom:
-                    r_slash_y = (222 + (i * 50)) - r_slash_h // 2
-                else:
-                    r_slash_y = (233 + (i * 50)) - r_slash_h
-                draw.text((r_slash_x, r_slash_y), text=slash, fill=(0, 0, 0), font=score_font)
 
-            if match.score1 > match.score2:
-                draw.polygon((((w // 8), 212 + (i * 50)), (((w // 8) + 10), 222 + (i * 50)), ((w // 8), 232 + (i * 50))), fill=(0, 0, 0), outline=(0, 0, 0))
-            else:
-                draw.polygon((((w - (w // 8)), 212 + (i * 50)), ((w - (w // 8) - 10), 222 + (i * 50)), ((w - (w // 8)), 232 + (i * 50))), fill=(0, 0, 0), outline=(0, 0, 0))
+MatchResult = namedtuple("MatchResult", ["players", "score1", "score2", "is_challenge"])
 
-    img.save('result.png')
 
-    smtp_server = 'smtp.gmail.com'
-    smtp_port = 587
-    smtp_username = 'lasustennis@gmail.com'
-    smtp_password = EMAIL_PASSWORD
+def get_day_results(number, year=None):
+    if year is None:
+        year = datetime.datetime.now().year
+    week = query_week_with_matches().join(Year, Week.year_id == Year.id) \
+        .filter(Week.number == number, Year.year == year).first()
+    return [
+        MatchResult([participant.player.name for participant in match.participants], match.score1, match.score2,
+                    match.is_challenge)
+        for match in week.matches
+    ]
 
-    server = smtplib.SMTP(smtp_server, smtp_port)
-    server.starttls()
-    server.login(smtp_username, smtp_password)
 
-    message = MIMEMultipart()
-    message['From'] = smtp_username
-    message['To'] = 'lasustennis@gmail.com'
-    message['Subject'] = f'DAY {number} LADDER GAME RESULTS'
+def render_week_result(number, year=None):
+    return render_day_image("results", number, year)
 
-    with open('result.png', 'rb') as f:
-        img_data = f.read()
-        image = MIMEImage(img_data, name=f'day{number}_ladder_games.png')
-        message.attach(image)
 
-    server.sendmail(smtp_username, 'lasustennis@gmail.com', message.as_string())
-    server.quit()
+def send_week_result(number, year=None):
+    get_mail_transport().send(f'DAY {number} LADDER GAME RESULTS',
+                              attachments=[render_report('results', number, year)])
 
 
-def send_table(day):
-    points_by_week = dict(sorted(get_cwp_with_players(get_weekly_points())[f"Day {day}"].items(), key=lambda x: x[1], reverse=True))
-    only_points = [points_by_week[x] for x in points_by_week]
-    if not day == 1:
-        points_previous_week = get_cwp_with_players(get_weekly_points())[f"Day {day - 1}"]
-        only_previous_week_points = sorted([points_previous_week[x] for x in points_previous_week], reverse=True)
-    matches_by_week = get_cwm_with_players(get_weekly_matches())[f"Day {day}"]
+def get_day_table(day, year=None):
+    standings = get_cumulative_standings(year)
+    points_by_week = dict(sorted(standings["points"].as_of(day).items(), key=lambda x: x[1], reverse=True))
+    matches_by_week = standings["matches"].as_of(day)
+    ranks = rank_players(points_by_week, standings["points"].as_of(day - 1) if day > 1 else None)
     table = {}
     for player in points_by_week:
-        shift = only_previous_week_points.index(points_previous_week[player]) - only_points.index(points_by_week[player])
         table[player] = {
-            "position": only_points.index(points_by_week[player]) + 1,
+            "position": ranks[player][0],
             "games": matches_by_week[player],
             "points": points_by_week[player],
-            "shift": shift
+            "shift": ranks[player][1]
         }
+    return table
 
-    if len(table) < 20:
-        img = Image.new('RGB', (900, 1350), (255, 255, 255))
-    else:
-        img = Image.new('RGB', (900 + ((len(table) - 20) * 34), 1350 + ((len(table) - 20) * 51)), (255, 255, 255))
-    draw = ImageDraw.Draw(img)
-    w, h = img.size
-
-    from_color = (0, 241, 255)
-    to_color = (214, 0, 255)
-    angle = math.pi * 15 / 180
-
-    for y in range(img.height):
-        for x in range(img.width):
-            frac = (math.cos(angle) * x + math.sin(angle) * y) / img.width
-            color = (
-                int(from_color[0] * (1 - frac) + to_color[0] * frac),
-                int(from_color[1] * (1 - frac) + to_color[1] * frac),
-                int(from_color[2] * (1 - frac) + to_color[2] * frac)
-            )
-            draw.point((x, y), fill=color)
-
-    # Heading
-    text = f"DAY {day} STANDINGS"
-    heading = ImageFont.truetype("fonts/RadikalTrial-Black-BF642254c139184.otf", 50)
-    text_width, text_height = draw.textsize(text, font=heading)
-    text_x = (w // 2) - text_width // 2
-    text_y = 100 - text_height // 2
-    draw.text((text_x, text_y), text=text, fill=(0, 0, 0), font=heading)
-
-    heading = ImageFont.truetype("fonts/RadikalTrial-Black-BF642254c139184.otf", 30)
-    text_width, text_height = draw.textsize("Games", font=heading)
-    text_x = ((w - (w // 9)) - 160) - text_width // 2
-    text_y = 170 - text_height // 2
-    draw.text((text_x, text_y), text="Games", fill=(0, 0, 0), font=heading)
-
-    text_width, text_height = draw.textsize("Pts", font=heading)
-    text_x = ((w - (w // 9)) - 50) - text_width // 2
-    text_y = 170 - text_height // 2
-    draw.text((text_x, text_y), text="Pts", fill=(0, 0, 0), font=heading)
-
-    # Players
-    i = 0
-    for player in table:
-        draw.rectangle((((w // 9), 200 + (i * 50)), ((w - (w // 9)), 244 + (i * 50))), fill=(255, 255, 255))
-
-        numbers_font = ImageFont.truetype("fonts/arialbd.ttf", 24)
-        font = ImageFont.truetype("fonts/RadikalTrial-Medium-BF642254c12fd7b.otf", 24)
-
-        pos = str(table[player]['position'])
-        pos_w, pos_h = draw.textsize(pos, font=numbers_font)
-        pos_x = ((w // 9) + 22) - pos_w // 2
-        pos_y = 222 + (i * 50) - pos_h // 2
-        draw.text((pos_x, pos_y), text=pos, fill=(0, 0, 0), font=numbers_font)
-
-        for y in range(200 + (i * 50), 245 + (i * 50)):
-            color = tuple(
-                int(img.getpixel((((w // 9) + 44), 197 + (i * 50)))[a] + ((255, 255, 255)[a] - img.getpixel((((w // 9) + 44), 197 + (i * 50)))[a]) * (y - (200 + (i * 50))) / ((244 + (i * 50)) - (200 + (i * 50)))) for a in range(3)
-            )
-            draw.line(((((w // 9) + 44), y), (((w // 9) + 47), y)), fill=color)
-
-        if table[player]['shift'] > 0:
-            draw.polygon(((((w // 9) + 68), 220 + (i * 50)), (((w // 9) + 80), 220 + (i * 50)), (((w // 9) + 74), 212 + (i * 50))), fill=(0, 255, 0), outline=(0, 255, 0))
-        else:
-            draw.polygon(((((w // 9) + 68), 220 + (i * 50)), (((w // 9) + 80), 220 + (i * 50)), (((w // 9) + 74), 212 + (i * 50))), fill=(200, 200, 200), outline=(200, 200, 200))
 
-        if table[player]['shift'] < 0:
-            draw.polygon(((((w // 9) + 68), 224 + (i * 50)), (((w // 9) + 80), 224 + (i * 50)), (((w // 9) + 74), 232 + (i * 50))), fill=(255, 0, 0), outline=(255, 0, 0))
-        else:
-            draw.polygon(((((w // 9) + 68), 224 + (i * 50)), (((w // 9) + 80), 224 + (i * 50)), (((w // 9) + 74), 232 + (i * 50))), fill=(200, 200, 200), outline=(200, 200, 200))
+def render_table(day, year=None):
+    return render_day_image("table", day, year)
 
-        name_h = draw.textsize(player, font=font)[1]
-        name_y = 222 + (i * 50) - name_h // 2
-        draw.text((((w // 9) + 100), name_y), text=player, fill=(0, 0, 0), font=font)
 
-        text_width, text_height = draw.textsize(str(table[player]['games']), font=numbers_font)
-        text_x = ((w - (w // 9)) - 160) - text_width // 2
-        text_y = 222 + (i * 50) - text_height // 2
-        draw.text((text_x, text_y), text=str(table[player]['games']), fill=(0, 0, 0), font=numbers_font)
+# Each day image's data loader and the name of the reporting function that draws it
+DAY_IMAGES = {
+    "results": (get_day_results, "draw_week_result"),
+    "table": (get_day_table, "draw_table")
+}
 
-        text_width, text_height = draw.textsize(str(table[player]['points']), font=numbers_font)
-        text_x = ((w - (w // 9)) - 50) - text_width // 2
-        text_y = 222 + (i * 50) - text_height // 2
-        draw.text((text_x, text_y), text=str(table[player]['points']), fill=(0, 0, 0), font=numbers_font)
 
-        i = i + 1
+def render_day_image(kind, day, year=None, data=None):
+    """Returns the PNG for one of the DAY_IMAGES, drawing it only if the render cache doesn't already hold it."""
+    get_data, draw = DAY_IMAGES[kind]
+    if data is None:
+        data = get_data(day, year)
 
-    draw.rectangle((((w // 9), 395), ((w - (w // 9)), 400)), fill=(3, 1, 61))
-    draw.rectangle((((w // 9), 595), ((w - (w // 9)), 600)), fill=(3, 1, 61))
-    img.save('table.png')
+    def render():
+        import reporting
+        return getattr(reporting, draw)(day, data)
 
-    smtp_server = 'smtp.gmail.com'
-    smtp_port = 587
-    smtp_username = 'lasustennis@gmail.com'
-    smtp_password = EMAIL_PASSWORD
+    return render_cache.get_or_render(kind, [day, data], render)
 
-    server = smtplib.SMTP(smtp_server, smtp_port)
-    server.starttls()
-    server.login(smtp_username, smtp_password)
 
-    message = MIMEMultipart()
-    message['From'] = smtp_username
-    message['To'] = 'lasustennis@gmail.com'
-    message['Subject'] = f'LADDER GAMES TABLE AS OF DAY {day}'
+def send_table(day, year=None):
+    get_mail_transport().send(f'LADDER GAMES TABLE AS OF DAY {day}', attachments=[render_report('table', day, year)])
 
-    with open('table.png', 'rb') as f:
-        img_data = f.read()
-        image = MIMEImage(img_data, name=f'day{day}_table.png')
-        message.attach(image)
 
-    server.sendmail(smtp_username, 'lasustennis@gmail.com', message.as_string())
-    server.quit()
+def send_weekly_digest(day, year=None):
+    """Emails the day's results, the standings, the four leaderboards and the cumulative points chart as one
+    message."""
+    attachments = [render_report(name, day, year) for name in ['results', 'table', *STAT_CHARTS, 'cwp']]
+    get_mail_transport().send(f'DAY {day} LADDER GAMES DIGEST', attachments=attachments)
 
 
-def get_weekly_points():
-    weekly_points = {}
-    try:
-        weeks = Year.query.filter_by(year=datetime.datetime.now().year).first().weeks
-    except AttributeError:
-        weeks = []
-    for week in weeks:
-        all_player_points = {}
-        players = Player.query.all()
-        for player in players:
-            player_points = 0
-            player_matches = player.matches
-            for match in player_matches:
-                if match in week.matches:
-                    match_players = match.players_order.split()
-                    if not match.is_challenge:
-                        if len(match_players) == 4:
-                            if match_players[0] == player.name or match_players[1] == player.name:
-                                player_points += match.score1
-                            elif match_players[2] == player.name or match_players[3] == player.name:
-                                player_points += match.score2
-                        elif len(match_players) == 2:
-                            if match_players[0] == player.name:
-                                player_points += match.score1
-                            elif match_players[1] == player.name:
-                                player_points += match.score2
-                    else:
-                        first_player_sets = 0
-                        second_player_sets = 0
-                        if match.score1 > match.score2:
-                            first_player_sets += 1
-                        else:
-                            second_player_sets += 1
-                        if match.set2_score1 > match.set2_score2:
-                            first_player_sets += 1
-                        else:
-                            second_player_sets += 1
-                        if first_player_sets == second_player_sets:
-                            if match.set3_score1 > match.set3_score2:
-                                first_player_sets += 1
-                            else:
-                                second_player_sets += 1
-                        if first_player_sets > second_player_sets:
-                            if player.name == match_players[0]:
-                                player_points += match.points_gained
-                        else:
-                            if player.name == match_players[1]:
-                                player_points += match.points_gained
-            all_player_points[player.name] = player_points
-        weekly_points[f"Day {week.number}"] = all_player_points
-    return weekly_points
-
-
-def get_weekly_points_without_challenge():
-    weekly_points = {}
-    try:
-        weeks = Year.query.filter_by(year=datetime.datetime.now().year).first().weeks
-    except AttributeError:
-        weeks = []
-    for week in weeks:
-        all_player_points = {}
-        players = Player.query.all()
-        for player in players:
-            player_points = 0
-            player_matches = player.matches
-            for match in player_matches:
-                if match in week.matches:
-                    match_players = match.players_order.split()
-                    if not match.is_challenge:
-                        if len(match_players) == 4:
-                            if match_players[0] == player.name or match_players[1] == player.name:
-                                player_points += match.score1
-                            elif match_players[2] == player.name or match_players[3] == player.name:
-                                player_points += match.score2
-                        elif len(match_players) == 2:
-                            if match_players[0] == player.name:
-                                player_points += match.score1
-                            elif match_players[1] == player.name:
-                                player_points += match.score2
-            all_player_points[player.name] = player_points
-        weekly_points[f"Day {week.number}"] = all_player_points
-    return weekly_points
-
-
-def get_cwp_with_players(weekly_points):
-    players_in_order = Player.query.order_by(Player.points).all()[::-1]
-    cumulative_weekly_points_with_players = {"Day 0": {player.name: 0 for player in players_in_order}}
-    for i in range(1, len(weekly_points) + 1):
-        cumulative_weekly_points_with_players[f"Day {i}"] = {player.name: 0 for player in players_in_order}
-        for j in range(1, i + 1):
-            for k in range(len(cumulative_weekly_points_with_players[f"Day {i}"])):
-                cumulative_weekly_points_with_players[f"Day {i}"][players_in_order[k].name] += weekly_points[f"Day {j}"][
-                    players_in_order[k].name]
-    return cumulative_weekly_points_with_players
-
-
-def get_weekly_matches():
-    weekly_matches = {}
-    try:
-        weeks = Year.query.filter_by(year=datetime.datetime.now().year).first().weeks
-    except AttributeError:
-        weeks = []
-    for week in weeks:
-        all_player_matches = {}
-        players = Player.query.all()
-        for player in players:
-            player_matches = 0
-            for match in player.matches:
-                if match in week.matches:
-                    player_matches = player_matches + 1
-            all_player_matches[player.name] = player_matches
-        weekly_matches[f"Day {week.number}"] = all_player_matches
-    return weekly_matches
+def archive_season(year_number):
+    """Freezes a season's ladder games page. Run by ``archive-season`` and by the worker once the next season
+    starts, never while serving a page."""
+    year = Year.query.filter_by(year=year_number).first()
+    if year is None:
+        return None
+    if not Standing.query.filter_by(year_id=year.id).first():
+        refresh_standings(year_number)
+    data = get_ladder_games_data(year_number)
+    SeasonArchive.query.filter_by(year_id=year.id).delete()
+    db.session.add(SeasonArchive(year_id=year.id, data=json.dumps(data), created_at=datetime.datetime.utcnow()))
+    db.session.commit()
+    return data
 
 
-def get_cwm_with_players(weekly_matches):
-    players = Player.query.all()
-    cumulative_weekly_matches_with_players = {"Day 0": {player.name: 0 for player in players}}
-    for i in range(1, len(weekly_matches) + 1):
-        cumulative_weekly_matches_with_players[f"Day {i}"] = {player.name: 0 for player in players}
-        for j in range(1, i + 1):
-            for k in range(len(cumulative_weekly_matches_with_players[f"Day {i}"])):
-                cumulative_weekly_matches_with_players[f"Day {i}"][players[k].name] += weekly_matches[f"Day {j}"][
-                    players[k].name]
-    return cumulative_weekly_matches_with_players
-
-
-def get_mpw():
-    weekly_points_without_challenge = get_weekly_points_without_challenge()
-    mpw = {}
-    for i in range(40, 0, -1):
-        for week in weekly_points_without_challenge:
-            for player in weekly_points_without_challenge[week]:
-                if weekly_points_without_challenge[week][player] == i:
-                    mpw[f"{player} ({week})"] = i
-    return mpw
-
-
-def get_ppg():
-    players_in_order = Player.query.order_by(Player.points).all()[::-1]
-    ppg = {}
-    for player in players_in_order:
-        try:
-            ppg[player.name] = round(float((player.points - player.challenge_points) / len(player.matches)), 2)
-        except ZeroDivisionError:
-            ppg[player.name] = 0
-    ppg_in_order = dict(sorted(ppg.items(), key=lambda x: x[1]))
-    ppg_in_order = dict(reversed(list(ppg_in_order.items())))
-    return ppg_in_order
+JOB_HANDLERS = {
+    "member_request": send_member_request,
+    "week_result": send_week_result,
+    "table": send_table,
+    "weekly_digest": send_weekly_digest,
+    "archive_season": archive_season
+}
 
 
-def get_wpct():
-    wpct = {}
-    players = Player.query.all()
-    for player in players:
-        matches_won = 0
-        for match in player.matches:
-            if not match.is_challenge:
-                match_players = match.players_order.split()
-                if len(match_players) == 4:
-                    if player.name == match_players[0] or player.name == match_players[1]:
-                        if match.score1 > match.score2:
-                            matches_won += 1
-                    else:
-                        if match.score1 < match.score2:
-                            matches_won += 1
-                else:
-                    if player.name == match_players[0]:
-                        if match.score1 > match.score2:
-                            matches_won += 1
-                    else:
-                        if match.score1 < match.score2:
-                            matches_won += 1
-        try:
-            wpct[player.name] = round((matches_won / (len(player.matches) - player.challenge_matches)) * 100, 2)
-        except ZeroDivisionError:
-            wpct[player.name] = 0
-    wpct_in_order = dict(sorted(wpct.items(), key=lambda x: x[1]))
-    wpct_in_order = dict(reversed(list(wpct_in_order.items())))
-    return wpct_in_order
+def enqueue_job(kind, **kwargs):
+    """Queues a job in the current transaction, so it is only picked up once the request's changes commit."""
+    now = datetime.datetime.now()
+    job = Job(kind=kind, payload=json.dumps(kwargs), status="pending", attempts=0, max_attempts=5, run_at=now,
+              created_at=now, updated_at=now)
+    db.session.add(job)
+    return job
 
 
-def get_mlgb():
-    mlgb = {}
+def claim_next_job():
+    """Marks the next due job as running and returns it. Jobs left running by a worker that died are retried, until
+    they have used up their attempts: a job that kills the worker never reaches run_job's error handling."""
+    now = datetime.datetime.now()
+    stale = now - datetime.timedelta(minutes=15)
+    Job.query.filter(Job.status == "running", Job.updated_at < stale, Job.attempts >= Job.max_attempts).update(
+        {"status": "failed", "last_error": "The worker stopped while running it", "updated_at": now},
+        synchronize_session=False
+    )
+    query = Job.query.filter(
+        db.or_(db.and_(Job.status == "pending", Job.run_at <= now),
+               db.and_(Job.status == "running", Job.updated_at < stale, Job.attempts < Job.max_attempts))
+    ).order_by(Job.run_at, Job.id)
+    if db.engine.dialect.name == "postgresql":
+        query = query.with_for_update(skip_locked=True)
+    job = query.first()
+    if job:
+        job.status = "running"
+        job.attempts += 1
+        job.updated_at = now
+    db.session.commit()
+    return job
+
+
+def run_job(job):
+    job_id = job.id
+    try:
+        JOB_HANDLERS[job.kind](**json.loads(job.payload))
+    except Exception:
+        db.session.rollback()
+        job = db.session.get(Job, job_id)
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            job.status = "failed"
+        else:
+            job.status = "pending"
+            job.run_at = datetime.datetime.now() + datetime.timedelta(seconds=JOB_RETRY_DELAY * 2 ** (job.attempts - 1))
+        app.logger.warning(f"Job {job.id} ({job.kind}) failed on attempt {job.attempts}")
+    else:
+        job = db.session.get(Job, job_id)
+        job.status = "done"
+        job.last_error = None
+    job.updated_at = datetime.datetime.now()
+    db.session.commit()
+
+
+def get_challenge_winner(match):
+    first_player_sets = 0
+    second_player_sets = 0
+    if match.score1 > match.score2:
+        first_player_sets += 1
+    else:
+        second_player_sets += 1
+    if match.set2_score1 > match.set2_score2:
+        first_player_sets += 1
+    else:
+        second_player_sets += 1
+    if first_player_sets == second_player_sets:
+        if match.set3_score1 > match.set3_score2:
+            first_player_sets += 1
+        else:
+            second_player_sets += 1
+    if first_player_sets > second_player_sets:
+        return 1
+    return 2
+
+
+def get_match_winner(match):
+    """Returns the winning side of a match (1 or 2), or None for a drawn ladder game."""
+    if match.is_challenge:
+        return get_challenge_winner(match)
+    if match.score1 > match.score2:
+        return 1
+    if match.score1 < match.score2:
+        return 2
+    return None
+
+
+def get_side_points(match, side):
+    """Returns the ladder points and the challenge points a player on the given side earned from the match."""
+    if not match.is_challenge:
+        return (match.score1 if side == 1 else match.score2), 0
+    if match.points_gained and get_challenge_winner(match) == side:
+        return 0, match.points_gained
+    return 0, 0
+
+
+def get_season_aggregate(year=None):
+    return get_season(year).aggregate
+
+
+def load_season_aggregate(year, players):
+    """Per-day points, challenge points and match counts for every player, computed in a single pass over the
+    season's match participants. Every day of the season is present, even days without a match."""
+    player_names = {player.id: player.name for player in players}
+    rows = db.session.query(Week.number, Match, PlayerMatch.player_id, PlayerMatch.side) \
+        .select_from(Week) \
+        .join(Year, Week.year_id == Year.id) \
+        .outerjoin(Match, Match.week_id == Week.id) \
+        .outerjoin(PlayerMatch, PlayerMatch.match_id == Match.id) \
+        .filter(Year.year == year) \
+        .order_by(Week.id, Match.id) \
+        .all()
+    aggregate = {
+        "points": {},
+        "points_without_challenge": {},
+        "challenge_points": {},
+        "matches": {}
+    }
+    for number, match, player_id, side in rows:
+        day = f"Day {number}"
+        if day not in aggregate["points"]:
+            for stat in aggregate.values():
+                stat[day] = {name: 0 for name in player_names.values()}
+        if player_id not in player_names:
+            continue
+        name = player_names[player_id]
+        ladder_points, challenge_points = get_side_points(match, side)
+        aggregate["matches"][day][name] += 1
+        aggregate["points"][day][name] += ladder_points + challenge_points
+        aggregate["points_without_challenge"][day][name] += ladder_points
+        aggregate["challenge_points"][day][name] += challenge_points
+    return aggregate
+
+
+def competition_ranks(values):
+    """Maps each value to its position when sorted from highest to lowest, with ties sharing the best position
+    (100, 90, 90, 80 rank 1, 2, 2, 4)."""
+    ranks = {}
+    for index, value in enumerate(sorted(values, reverse=True)):
+        ranks.setdefault(value, index + 1)
+    return ranks
+
+
+def rank_players(points, previous_points=None):
+    """Returns {player: (position, shift)} for a points table. Shift is how many places a player climbed since
+    ``previous_points``, or 0 when there is no previous table."""
+    ranks = competition_ranks(points.values())
+    previous_ranks = competition_ranks(previous_points.values()) if previous_points is not None else None
+    result = {}
+    for player, player_points in points.items():
+        position = ranks[player_points]
+        shift = previous_ranks[previous_points[player]] - position if previous_ranks is not None else 0
+        result[player] = (position, shift)
+    return result
+
+
+class CumulativeStandings:
+    """Running totals of a per-day stat, one ``array('i')`` per player: ``series[name][i]`` is the player's total
+    as of Day i, with Day 0 the start of the season. Any snapshot is a lookup and recording a match only touches
+    its players from its day on."""
+
+    def __init__(self, weekly, player_names):
+        self.days = len(weekly)
+        self.series = {}
+        for name in player_names:
+            total = 0
+            series = array('i', [total])
+            for i in range(1, self.days + 1):
+                total += weekly[f"Day {i}"].get(name, 0)
+                series.append(total)
+            self.series[name] = series
+
+    def as_of(self, day):
+        return {name: series[day] for name, series in self.series.items()}
+
+    def add(self, day, deltas):
+        if day == self.days + 1:
+            for series in self.series.values():
+                series.append(series[-1])
+            self.days = day
+        for name, delta in deltas.items():
+            series = self.series.get(name)
+            if series is not None:
+                for i in range(day, self.days + 1):
+                    series[i] += delta
+
+
+_cumulative_standings = {}
+
+
+def get_season_fingerprint(year):
+    match_count, last_match_id, week_count = db.session.query(
+        db.func.count(Match.id), db.func.max(Match.id), db.func.count(db.distinct(Week.id))
+    ).select_from(Week).join(Year, Week.year_id == Year.id).outerjoin(Match, Match.week_id == Week.id) \
+        .filter(Year.year == year).one()
+    return match_count, last_match_id, week_count, Player.query.count()
+
+
+def get_cumulative_standings(year=None):
+    """Cumulative points and games of a season, cached per worker and rebuilt only when the season's matches
+    were changed by something other than ``apply_match_deltas``."""
+    if year is None:
+        year = datetime.datetime.now().year
+    fingerprint = get_season_fingerprint(year)
+    cached = _cumulative_standings.get(year)
+    if cached is None or cached["fingerprint"] != fingerprint:
+        season = get_season(year)
+        aggregate = season.aggregate
+        player_names = [player.name for player in season.players_by_points]
+        cached = {
+            "fingerprint": fingerprint,
+            "points": CumulativeStandings(aggregate["points"], player_names),
+            "matches": CumulativeStandings(aggregate["matches"], player_names)
+        }
+        _cumulative_standings[year] = cached
+    return cached
+
+
+def get_match_deltas(match):
+    points = {}
+    matches = {}
+    for participant in match.participants:
+        points[participant.player.name] = sum(get_side_points(match, participant.side))
+        matches[participant.player.name] = 1
+    return match.week.year.year, match.week.number, points, matches, match.id
+
+
+def apply_match_deltas(year, day, points, matches, match_id, sign=1):
+    """Updates the cached standings of a season after a match was committed (sign=1) or deleted (sign=-1).
+
+    The update is only trusted if the season now differs from the cached one by exactly this match. If anything
+    else changed in between, such as a match another worker committed, the cache is dropped and rebuilt on the
+    next read.
+    """
+    cached = _cumulative_standings.get(year)
+    if cached is None:
+        return
+    match_count, last_match_id, week_count, player_count = cached["fingerprint"]
+    if sign == 1:
+        new_day = day == cached["points"].days + 1
+        expected = (match_count + 1, max(last_match_id or 0, match_id), week_count + new_day, player_count)
+    elif match_id != last_match_id:
+        expected = (match_count - 1, last_match_id, week_count, player_count)
+    else:
+        # The season's new last match id is unknown without a query of its own
+        expected = None
+    fingerprint = get_season_fingerprint(year)
+    if day > cached["points"].days + 1 or fingerprint != expected:
+        del _cumulative_standings[year]
+        return
+    cached["points"].add(day, {name: sign * value for name, value in points.items()})
+    cached["matches"].add(day, {name: sign * value for name, value in matches.items()})
+    cached["fingerprint"] = fingerprint
+
+
+def refresh_standings(year_number=None, from_day=1):
+    """Rewrites the persisted standings of a season from ``from_day`` onwards, then brings the players' position,
+    shift and points up to date with the current season, whichever season was written."""
+    if year_number is None:
+        year_number = datetime.datetime.now().year
+    year = Year.query.filter_by(year=year_number).first()
+    if year is None:
+        return
+    from_day = max(from_day, 1)
+    SeasonArchive.query.filter_by(year_id=year.id).delete()
+    standings = get_cumulative_standings(year_number)
+    last_day = standings["points"].days
     players = Player.query.all()
+    Standing.query.filter(Standing.year_id == year.id, Standing.day >= from_day).delete()
+    for day in range(from_day, last_day + 1):
+        points = standings["points"].as_of(day)
+        previous_points = standings["points"].as_of(day - 1)
+        games = standings["matches"].as_of(day)
+        ranks = rank_players(points, previous_points if day > 1 else None)
+        for player in players:
+            position, shift = ranks[player.name]
+            db.session.add(Standing(year_id=year.id, day=day, player_id=player.id, points=points[player.name],
+                                    games=games[player.name], position=position, shift=shift))
+    update_player_standings(players)
+    db.session.commit()
+
+
+def update_player_standings(players):
+    """Sets each player's position, shift and points to those of the last day of the current season. Player.points
+    is only ever derived here, so recording a match of any season can't throw it off."""
+    if Year.query.filter_by(year=datetime.datetime.now().year).first() is None:
+        return
+    standings = get_cumulative_standings()["points"]
+    last_day = standings.days
+    points = standings.as_of(last_day)
+    ranks = rank_players(points, standings.as_of(last_day - 1) if last_day > 1 else None)
     for player in players:
-        n = 0
-        for match in player.matches:
-            if not match.is_challenge:
-                match_players = match.players_order.split()
-                if len(match_players) == 4:
-                    if player.name == match_players[0] or player.name == match_players[1]:
-                        if match.score1 == 5:
-                            n += 1
-                    else:
-                        if match.score2 == 5:
-                            n += 1
-                else:
-                    if player.name == match_players[0]:
-                        if match.score1 == 5:
-                            n += 1
-                    else:
-                        if match.score2 == 5:
-                            n += 1
-        mlgb[player.name] = n
-    mlgb_in_order = dict(sorted(mlgb.items(), key=lambda x: x[1]))
-    mlgb_in_order = dict(reversed(list(mlgb_in_order.items())))
-    return mlgb_in_order
+        player.position, player.shift = ranks[player.name]
+        player.points = points[player.name]
+
+
+def get_best_days(limit=10, year=None):
+    """The season's best single-day ladder points totals as (player, day, points), highest first and in day order
+    within a tie. Everyone tied with the last place is kept, so more than ``limit`` rows can come back."""
+    aggregate = get_season_aggregate(year)
+    performances = [
+        (player, day, points)
+        for day, day_points in aggregate["points_without_challenge"].items()
+        for player, points in day_points.items()
+        if aggregate["matches"][day][player]
+    ]
+    best = heapq.nlargest(limit, range(len(performances)), key=lambda i: (performances[i][2], -i))
+    if len(best) == limit:
+        chosen = set(best)
+        last_points = performances[best[-1]][2]
+        best += [i for i, performance in enumerate(performances) if performance[2] == last_points and i not in chosen]
+    return [performances[i] for i in best]
+
+
+def get_mpw(year=None):
+    return {f"{player} ({day})": points for player, day, points in get_best_days(year=year)}
+
+
+def query_season_records(year=None):
+    """A subquery of every player's games in a season (the current one by default): all games played, and the
+    ladder (non-challenge) points scored and games played, won and bagelled (finished on 5)."""
+    if year is None:
+        year = datetime.datetime.now().year
+    own_score = db.case((PlayerMatch.side == 1, Match.score1), else_=Match.score2)
+    other_score = db.case((PlayerMatch.side == 1, Match.score2), else_=Match.score1)
+    ladder = Match.is_challenge.is_(False)
+    return db.session.query(
+        PlayerMatch.player_id,
+        db.func.count().label("games"),
+        db.func.sum(db.case((ladder, own_score), else_=0)).label("ladder_points"),
+        db.func.sum(db.case((ladder, 1), else_=0)).label("played"),
+        db.func.sum(db.case((db.and_(ladder, own_score > other_score), 1), else_=0)).label("won"),
+        db.func.sum(db.case((db.and_(ladder, own_score == 5), 1), else_=0)).label("bagels")
+    ).join(Match, PlayerMatch.match_id == Match.id) \
+        .join(Week, Match.week_id == Week.id) \
+        .join(Year, Week.year_id == Year.id) \
+        .filter(Year.year == year) \
+        .group_by(PlayerMatch.player_id) \
+        .subquery()
+
+
+def get_ppg(year=None):
+    records = query_season_records(year)
+    games = db.func.coalesce(records.c.games, 0)
+    ladder_points = db.func.coalesce(records.c.ladder_points, 0)
+    ratio = db.func.coalesce(db.cast(ladder_points, db.Float) / db.func.nullif(games, 0), 0)
+    rows = db.session.query(Player.name, ladder_points, games) \
+        .outerjoin(records, records.c.player_id == Player.id) \
+        .order_by(ratio.desc(), ladder_points, Player.id)
+    return {name: round(float(points / games), 2) if games else 0 for name, points, games in rows}
+
+
+def get_wpct(year=None):
+    records = query_season_records(year)
+    win_percentage = db.func.coalesce(100.0 * records.c.won / db.func.nullif(records.c.played, 0), 0)
+    rows = db.session.query(Player.name, records.c.played, records.c.won) \
+        .outerjoin(records, records.c.player_id == Player.id) \
+        .order_by(win_percentage.desc(), Player.id.desc())
+    return {name: round((won / played) * 100, 2) if played else 0 for name, played, won in rows}
+
+
+def get_mlgb(year=None):
+    records = query_season_records(year)
+    bagels = db.func.coalesce(records.c.bagels, 0)
+    rows = db.session.query(Player.name, bagels) \
+        .outerjoin(records, records.c.player_id == Player.id) \
+        .order_by(bagels.desc(), Player.id.desc())
+    return dict(rows)
+
+
+STAT_CHARTS = {
+    'mpw': ('MOST POINTS IN A DAY', get_mpw),
+    'ppg': ('BEST POINTS PER GAME RATIO', get_ppg),
+    'wpct': ('BEST LADDER GAMES WIN RATIO', get_wpct),
+    'mlgb': ('MOST LADDER GAME BAGELS', get_mlgb)
+}
+
+
+def render_report(name, day=None, year=None, profile=None):
+    """Renders one of the club's report images in memory and returns it as (filename, PNG bytes).
+
+    ``name`` is 'results' or 'table' (both need ``day``), 'cwp', or one of the STAT_CHARTS keys, all for the season
+    ``year`` (the current one by default). Charts use the chart ``profile``, CHART_PROFILE by default.
+    """
+    if name == 'results':
+        return f'day{day}_ladder_games.png', render_week_result(day, year)
+    if name == 'table':
+        return f'day{day}_table.png', render_table(day, year)
+    if name == 'cwp':
+        return 'cwp.png', render_cwp(profile, year)
+    import reporting
+    title, get_stat = STAT_CHARTS[name]
+    return stat_filename(title), reporting.render_stat(get_stat(year), title, profile or app.config['CHART_PROFILE'])
+
+
+PAIR_STAT_COUNTERS = ("singles_played", "singles_won1", "singles_won2", "doubles_played", "doubles_won1",
+                      "doubles_won2", "teammates_played", "teammates_won")
+
+
+def get_pair_deltas(match, sign=1):
+    """What a match adds to (sign=1) or removes from (sign=-1) the head-to-head record of every pair of its players,
+    as {(player1_id, player2_id): {counter: change}}."""
+    winner = get_match_winner(match)
+    participants = sorted(match.participants, key=lambda participant: participant.player.id)
+    deltas = {}
+    for i, first in enumerate(participants):
+        for second in participants[i + 1:]:
+            changes = deltas[(first.player.id, second.player.id)] = {}
+            if len(participants) == 2:
+                changes["singles_played"] = sign
+                if winner == first.side:
+                    changes["singles_won1"] = sign
+                elif winner == second.side:
+                    changes["singles_won2"] = sign
+            elif first.side == second.side:
+                changes["teammates_played"] = sign
+                if winner == first.side:
+                    changes["teammates_won"] = sign
+            else:
+                changes["doubles_played"] = sign
+                if winner == first.side:
+                    changes["doubles_won1"] = sign
+                elif winner == second.side:
+                    changes["doubles_won2"] = sign
+    return deltas
+
+
+def update_pair_stats(match, sign=1):
+    """Adds (sign=1) or removes (sign=-1) a match from the head-to-head record of every pair of its players."""
+    for (player1_id, player2_id), changes in get_pair_deltas(match, sign).items():
+        stat = db.session.get(PairStat, (player1_id, player2_id))
+        if stat is None:
+            stat = PairStat(player1_id=player1_id, player2_id=player2_id, **dict.fromkeys(PAIR_STAT_COUNTERS, 0))
+            db.session.add(stat)
+            db.session.flush()
+        for counter, change in changes.items():
+            setattr(stat, counter, getattr(PairStat, counter) + change)
+
+
+def get_h2h_record(first, second):
+    """The head-to-head record of two players from the side of ``first``, read from their pair statistics."""
+    low, high = sorted((first.id, second.id))
+    stat = db.session.get(PairStat, (low, high))
+    record = {
+        "singles": {"played": 0, "player1": 0, "player2": 0},
+        "doubles": {"played": 0, "player1": 0, "player2": 0},
+        "teammates": {"played": 0, "won": 0}
+    }
+    if stat is None:
+        return record
+    for category in ("singles", "doubles"):
+        won = (getattr(stat, f"{category}_won1"), getattr(stat, f"{category}_won2"))
+        if first.id != low:
+            won = won[::-1]
+        record[category] = {"played": getattr(stat, f"{category}_played"), "player1": won[0], "player2": won[1]}
+    record["teammates"] = {"played": stat.teammates_played, "won": stat.teammates_won}
+    return record
+
+
+def record_match(new_match, day, year_number):
+    """Files a new match under its day of the season, opening the day (and the season) with its first match, then
+    commits it and brings the pair stats and standings up to date."""
+    year = Year.query.filter_by(year=year_number).first()
+    week = Week.query.filter_by(number=day, year_id=year.id).first() if year else None
+    if week is None:
+        last_week = Week.query.order_by(Week.id.desc()).first()
+        # Backfilling an older day or season doesn't close the newest day or season
+        if last_week and (year_number, day) > (last_week.year.year, last_week.number) and Week.query.count() != 1:
+            # The previous day is over: send its results, table and stats as one digest
+            enqueue_job("weekly_digest", day=last_week.number, year=last_week.year.year)
+        if year is None:
+            year = Year(year=year_number)
+            db.session.add(year)
+            if last_week and year_number > last_week.year.year:
+                # A new season has started, so the last one is over: freeze its page
+                enqueue_job("archive_season", year_number=last_week.year.year)
+        week = Week(number=day, first_saturday=datetime.datetime.now().strftime("%d %B"), year=year)
+        db.session.add(week)
+    new_match.week = week
+    db.session.add(new_match)
+    update_pair_stats(new_match)
+    db.session.commit()
+    deltas = get_match_deltas(new_match)
+    apply_match_deltas(*deltas)
+    refresh_standings(deltas[0], from_day=deltas[1])
 
 
 def del_match(match_id):
     with app.app_context():
         match = Match.query.get(match_id)
-        match_players = match.players_order.split()
+        deltas = get_match_deltas(match)
         if match.is_challenge:
-            player2 = Player.query.filter_by(name=match_players[-1]).first()
-            player2.challenge_matches -= 1
-            player1 = Player.query.filter_by(name=match_players[-1]).first()
+            player1, player2 = [participant.player for participant in match.participants]
             player1.challenge_matches -= 1
-            first_player_sets = 0
-            second_player_sets = 0
-            if match.score1 > match.score2:
-                first_player_sets += 1
-            else:
-                second_player_sets += 1
-            if match.set2_score1 > match.set2_score2:
-                first_player_sets += 1
-            else:
-                second_player_sets += 1
-            if first_player_sets == second_player_sets:
-                if match.set3_score1 > match.set3_score2:
-                    first_player_sets += 1
-                else:
-                    second_player_sets += 1
-            if first_player_sets > second_player_sets:
-                player1.challenge_points -= match.points_gained
-                player1.points -= match.points_gained
-            else:
-                player2.challenge_points -= match.points_gained
-                player2.points -= match.points_gained
-        for player in match.players:
-            match.players.remove(player)
+            player2.challenge_matches -= 1
+            if match.points_gained:
+                winner = player1 if get_challenge_winner(match) == 1 else player2
+                winner.challenge_points -= match.points_gained
+        update_pair_stats(match, sign=-1)
         db.session.delete(match)
         db.session.commit()
+        apply_match_deltas(*deltas, sign=-1)
+        refresh_standings(deltas[0], from_day=deltas[1])
 
 
 @app.route("/")
@@ -825,114 +1426,127 @@ def home():
 
 
 @app.route("/ladder-games", methods=['GET', 'POST'])
-def ladder_games():
-    form = HeadToHeadForm()
-    with app.app_context():
-        player_names = sorted([""] + [player.name for player in Player.query.all()])
-    form.player_1.choices = player_names
-    form.player_2.choices = player_names
+@app.route("/ladder-games/<int:year>", methods=['GET', 'POST'])
+def ladder_games(year=None):
     if request.method == 'POST':
+        form = HeadToHeadForm()
         return redirect(url_for('h2h', p1=form.player_1.data, p2=form.player_2.data))
-    with app.app_context():
-        players = Player.query.all()
-
-        weekly_points = get_weekly_points()
-        cumulative_weekly_points_with_players = get_cwp_with_players(weekly_points)
+    current_year = datetime.datetime.now().year
+    if year is None:
+        year = current_year
+    if year > current_year:
+        abort(404)
+    if year < current_year:
+        data = get_season_archive(year)
+        if data is not None:
+            return render_ladder_games(year, data)
+        if Year.query.filter_by(year=year).first() is None:
+            abort(404)
+    # Everyone sees the same data until the next recorded change; the page itself carries a per-session CSRF token
+    return render_ladder_games(year, cached(f"ladder-games:{year}:data", lambda: get_ladder_games_data(year)))
+
+
+def render_ladder_games(year, data):
+    form = HeadToHeadForm()
+    form.player_1.choices = data["player_names"]
+    form.player_2.choices = data["player_names"]
+    return render_template("ladder-games.html", year=year, form=form, **data)
+
+
+def get_days_data(weeks):
+    """The days and matches the ladder-days.html template lists, as plain data."""
+    days = [
+        {
+            "number": week.number,
+            "first_saturday": week.first_saturday,
+            "matches": [
+                {
+                    "is_challenge": match.is_challenge,
+                    "score1": match.score1,
+                    "score2": match.score2,
+                    "set2_score1": match.set2_score1,
+                    "set2_score2": match.set2_score2,
+                    "set3_score1": match.set3_score1,
+                    "set3_score2": match.set3_score2
+                }
+                for match in week.matches
+            ]
+        }
+        for week in weeks
+    ]
+    match_players = [[[participant.player.name for participant in match.participants] for match in week.matches]
+                     for week in weeks]
+    return {
+        "weeks": days,
+        "no_of_weeks": len(days),
+        "no_of_matches": [len(day["matches"]) for day in days],
+        "players_in_matches": [[len(names) for names in week] for week in match_players],
+        "match_players": match_players
+    }
 
-        mpw = get_mpw()
-        ppg = get_ppg()
-        wpct = get_wpct()
-        mlgb = get_mlgb()
 
-        try:
-            weeks_in_year = Year.query.filter_by(year=datetime.datetime.now().year).first().weeks
-        except AttributeError:
-            pass
-        else:
-            if len(weeks_in_year) > 1:
-                previous_week = weeks_in_year[-2].number
-            elif len(weeks_in_year) == 1:
-                previous_week = 0
-            else:
-                previous_week = -1
-
-            current_week = previous_week + 1
-            if previous_week >= 0:
-                pwa = dict(
-                    sorted(
-                        cumulative_weekly_points_with_players[f"Day {previous_week}"].items(), key=lambda x: x[1]
-                    )
-                )
-                previous_week_arrangement = [cumulative_weekly_points_with_players[f"Day {previous_week}"][x] for x in pwa][::-1]
-
-                cwa = dict(
-                    sorted(
-                        cumulative_weekly_points_with_players[f"Day {current_week}"].items(), key=lambda x: x[1]
-                    )
-                )
-                current_week_arrangement = [cumulative_weekly_points_with_players[f"Day {current_week}"][x] for x in cwa][
-                                            ::-1]
-            else:
-                pwa = dict(
-                    sorted(
-                        cumulative_weekly_points_with_players[f"Day 0"].items(), key=lambda x: x[1]
-                    )
-                )
-                previous_week_arrangement = [cumulative_weekly_points_with_players[f"Day 0"][x] for x in
-                                             pwa][::-1]
-
-                cwa = dict(
-                    sorted(
-                        cumulative_weekly_points_with_players[f"Day {current_week}"].items(), key=lambda x: x[1]
-                    )
-                )
-                current_week_arrangement = [cumulative_weekly_points_with_players[f"Day {current_week}"][x] for x in
-                                            cwa][
-                                           ::-1]
+def get_ladder_games_data(year_number):
+    """Everything the ladder games page shows for a season, as plain data that can be cached and archived. Only
+    the most recent days are included; the page loads older ones from ``ladder_days``."""
+    season = get_season(year_number)
+    mpw = cached(f"ladder-games:{year_number}:mpw", lambda: get_mpw(year_number))
+    ppg = cached(f"ladder-games:{year_number}:ppg", lambda: get_ppg(year_number))
+    wpct = cached(f"ladder-games:{year_number}:wpct", lambda: get_wpct(year_number))
+    mlgb = cached(f"ladder-games:{year_number}:mlgb", lambda: get_mlgb(year_number))
 
-            for player in players:
-                if not player.position:
-                    player.position = current_week_arrangement.index(cumulative_weekly_points_with_players[f"Day {current_week}"][player.name]) + 1
-                    player.shift = 0
-                else:
-                    player.position = current_week_arrangement.index(cumulative_weekly_points_with_players[f"Day {current_week}"][player.name]) + 1
-                    player.shift = (previous_week_arrangement.index(cumulative_weekly_points_with_players[f"Day {previous_week}"][player.name]) + 1) - player.position
-                player.points = cumulative_weekly_points_with_players[f"Day {current_week}"][player.name]
-            db.session.commit()
     try:
-        players = Player.query.order_by(Player.points).all()[::-1]
-        weeks = Year.query.filter_by(year=datetime.datetime.now().year).first().weeks[::-1]
-        no_of_weeks = len(weeks)
-        no_of_matches = [len(week.matches) for week in weeks]
-        players_in_matches = [[len(match.players) for match in week.matches] for week in weeks]
-        match_players = [[match.players_order.split() for match in week.matches] for week in weeks]
-        games_played = [len(player.matches) for player in players]
+        year = season.year
+        last_day = db.session.query(db.func.max(Standing.day)).filter(Standing.year_id == year.id).scalar()
+        standings = query_standings(year, last_day).all()
+        players = [
+            {
+                "position": standing.position,
+                "shift": standing.shift,
+                "points": standing.points,
+                "player": {"name": standing.player.name, "rank": standing.player.rank}
+            }
+            for standing in standings
+        ]
+        games_played = [standing.games for standing in standings]
+        weeks, older_days_before = query_day_page(year)
     except AttributeError:
         players = []
         weeks = []
-        no_of_weeks = len(weeks)
-        no_of_matches = []
-        players_in_matches = [[]]
-        match_players = [[]]
+        older_days_before = None
         games_played = []
 
-    return render_template(
-        "ladder-games.html",
-        players=players,
-        games=games_played,
-        no_of_players=len(players),
-        weeks=weeks,
-        no_of_weeks=no_of_weeks,
-        no_of_matches=no_of_matches,
-        players_in_matches=players_in_matches,
-        match_players=match_players,
-        mpw=mpw,
-        ppg=ppg,
-        wpct=wpct,
-        mlgb=mlgb,
-        year=datetime.datetime.now().year,
-        form=form
-    )
+    return {
+        "players": players,
+        "games": games_played,
+        "no_of_players": len(players),
+        **get_days_data(weeks),
+        "older_days_before": older_days_before,
+        "player_names": sorted([""] + [player.name for player in season.players]),
+        "mpw": mpw,
+        "ppg": ppg,
+        "wpct": wpct,
+        "mlgb": mlgb
+    }
+
+
+@app.route("/ladder-games/<int:year>/days")
+def ladder_days(year):
+    """The days of a season before ?before=, rendered as a fragment the ladder games page appends on demand."""
+    season_year = Year.query.filter_by(year=year).first()
+    before = request.args.get('before', type=int)
+    if season_year is None or before is None:
+        abort(404)
+    weeks, older_days_before = query_day_page(season_year, before)
+    return render_template("ladder-days.html", year=year, older_days_before=older_days_before,
+                           **get_days_data(weeks))
+
+
+def get_season_archive(year_number):
+    """The frozen ladder games page data of a past season, or None if it hasn't been archived (yet)."""
+    archive = SeasonArchive.query.join(Year, SeasonArchive.year_id == Year.id).filter(Year.year == year_number).first()
+    if archive is not None:
+        return json.loads(archive.data)
+    return None
 
 
 @app.route("/head-to-head", methods=['GET', 'POST'])
@@ -940,7 +1554,8 @@ def h2h():
     player1 = request.args.get('p1')
     player2 = request.args.get('p2')
     form = HeadToHeadForm(player_1=player1, player_2=player2)
-    all_matches = Match.query.filter(Match.players_order.contains(player1), Match.players_order.contains(player2))
+    first = Player.query.filter_by(name=player1).first()
+    second = Player.query.filter_by(name=player2).first()
     matches_all = {
         "singles": {
             "matches": [],
@@ -960,45 +1575,24 @@ def h2h():
             "won": 0,
         }
     }
-    for match in all_matches:
-        players = match.players_order.split()
-        if len(players) == 2:
-            matches_all["singles"]["matches"].append(match)
-            if match.score1 > match.score2:
-                if player1 == players[0]:
-                    matches_all["singles"]["player1"] += 1
-                else:
-                    matches_all["singles"]["player2"] += 1
-            else:
-                if player1 == players[1]:
-                    matches_all["singles"]["player1"] += 1
-                else:
-                    matches_all["singles"]["player2"] += 1
-        else:
-            if sorted([player1, player2]) == sorted(players[0:2]):
-                matches_all["teammates"]["matches"].append(match)
-                if match.score1 > match.score2:
-                    matches_all["teammates"]["won"] += 1
-            elif sorted([player1, player2]) == sorted(players[2:]):
+    if first and second and first.id != second.id:
+        first_participant = aliased(PlayerMatch)
+        second_participant = aliased(PlayerMatch)
+        all_matches = db.session.query(Match, first_participant.side, second_participant.side) \
+            .join(first_participant, first_participant.match_id == Match.id) \
+            .join(second_participant, second_participant.match_id == Match.id) \
+            .filter(first_participant.player_id == first.id, second_participant.player_id == second.id) \
+            .options(joinedload(Match.week), selectinload(Match.participants)) \
+            .order_by(Match.id)
+        for match, first_side, second_side in all_matches:
+            if len(match.participants) == 2:
+                matches_all["singles"]["matches"].append(match)
+            elif first_side == second_side:
                 matches_all["teammates"]["matches"].append(match)
-                matches_all["teammates"]["played"] += 1
-                if match.score1 < match.score2:
-                    matches_all["teammates"]["won"] += 1
             else:
                 matches_all["doubles"]["matches"].append(match)
-                if player1 in players[0:2]:
-                    if match.score1 > match.score2:
-                        matches_all["doubles"]["player1"] += 1
-                    else:
-                        matches_all["doubles"]["player2"] += 1
-                else:
-                    if match.score1 < match.score2:
-                        matches_all["doubles"]["player1"] += 1
-                    else:
-                        matches_all["doubles"]["player2"] += 1
-    matches_all["singles"]["played"] = len(matches_all["singles"]["matches"])
-    matches_all["doubles"]["played"] = len(matches_all["doubles"]["matches"])
-    matches_all["teammates"]["played"] = len(matches_all["teammates"]["matches"])
+        for category, record in get_h2h_record(first, second).items():
+            matches_all[category].update(record)
     with app.app_context():
         player_names = sorted([""] + [player.name for player in Player.query.all()])
     form.player_1.choices = player_names
@@ -1008,6 +1602,21 @@ def h2h():
     return render_template('head2head.html', form=form, h2h=matches_all, year=datetime.datetime.now().year)
 
 
+@app.route("/head-to-head/matrix")
+def h2h_matrix():
+    names = {player.id: player.name for player in Player.query.all()}
+    pairs = []
+    for stat in PairStat.query.order_by(PairStat.player1_id, PairStat.player2_id):
+        pairs.append({
+            "player1": names[stat.player1_id],
+            "player2": names[stat.player2_id],
+            "singles": {"played": stat.singles_played, "player1": stat.singles_won1, "player2": stat.singles_won2},
+            "doubles": {"played": stat.doubles_played, "player1": stat.doubles_won1, "player2": stat.doubles_won2},
+            "teammates": {"played": stat.teammates_played, "won": stat.teammates_won}
+        })
+    return jsonify(players=sorted(names.values()), pairs=pairs)
+
+
 @app.route("/join", methods=['GET', 'POST'])
 def join():
     form = JoinForm()
@@ -1015,7 +1624,8 @@ def join():
         name = form.name.data
         phone_no = form.phone_no.data
         experience = form.experience.data
-        send_member_request(name, phone_no, experience)
+        enqueue_job("member_request", name=name, phone_no=phone_no, experience=experience)
+        db.session.commit()
         flash("Your details have been sent to the board! You will be gotten back to.")
         return redirect(url_for('home'))
     return render_template("join.html", form=form)
@@ -1083,35 +1693,11 @@ def singles_ladder_match():
         with app.app_context():
             new_match = Match(score1=score_1, score2=score_2, is_challenge=False)
             player1 = Player.query.filter_by(name=player_1).first()
-            new_match.players.append(player1)
-            player1.points += score_1
+            new_match.participants.append(PlayerMatch(player=player1, side=1, slot=1))
             player2 = Player.query.filter_by(name=player_2).first()
-            new_match.players.append(player2)
-            player2.points += score_2
+            new_match.participants.append(PlayerMatch(player=player2, side=2, slot=1))
             new_match.players_order = f"{player_1} {player_2}"
-            yr = Year.query.filter_by(year=form_year).first()
-            if yr:
-                yr_weeks = yr.weeks
-                weeks_in_years = [wk.number for wk in yr_weeks]
-            else:
-                weeks_in_years = []
-            if week in weeks_in_years:
-                new_match.week = Week.query.filter_by(number=week).first()
-            else:
-                if len(Week.query.all()) != 1:
-                    send_week_result(Week.query.all()[-1].number)
-                    send_table(Week.query.all()[-1].number)
-                new_week = Week(number=week, first_saturday=datetime.datetime.now().strftime("%d %B"))
-                if form_year in [y.year for y in Year.query.all()]:
-                    new_week.year = Year.query.filter_by(year=form_year).first()
-                else:
-                    new_year = Year(year=form_year)
-                    db.session.add(new_year)
-                    new_week.year = new_year
-                new_match.week = new_week
-                db.session.add(new_week)
-            db.session.add(new_match)
-            db.session.commit()
+            record_match(new_match, week, form_year)
         return redirect(url_for("admin"))
     return render_template("singles-ladder-match.html", form=form)
 
@@ -1158,41 +1744,15 @@ def doubles_ladder_match():
         with app.app_context():
             new_match = Match(score1=score_1, score2=score_2, is_challenge=False)
             player1 = Player.query.filter_by(name=player_1).first()
-            new_match.players.append(player1)
-            player1.points += score_1
+            new_match.participants.append(PlayerMatch(player=player1, side=1, slot=1))
             player2 = Player.query.filter_by(name=player_2).first()
-            new_match.players.append(player2)
-            player2.points += score_1
+            new_match.participants.append(PlayerMatch(player=player2, side=1, slot=2))
             player3 = Player.query.filter_by(name=player_3).first()
-            new_match.players.append(player3)
-            player3.points += score_2
+            new_match.participants.append(PlayerMatch(player=player3, side=2, slot=1))
             player4 = Player.query.filter_by(name=player_4).first()
-            new_match.players.append(player4)
-            player4.points += score_2
+            new_match.participants.append(PlayerMatch(player=player4, side=2, slot=2))
             new_match.players_order = f"{player_1} {player_2} {player_3} {player_4}"
-            yr = Year.query.filter_by(year=form_year).first()
-            if yr:
-                yr_weeks = yr.weeks
-                weeks_in_years = [wk.number for wk in yr_weeks]
-            else:
-                weeks_in_years = []
-            if week in weeks_in_years:
-                new_match.week = Week.query.filter_by(number=week).first()
-            else:
-                if len(Week.query.all()) != 1:
-                    send_week_result(Week.query.all()[-1].number)
-                    send_table(Week.query.all()[-1].number)
-                new_week = Week(number=week, first_saturday=datetime.datetime.now().strftime("%d %B"))
-                if form_year in [y.year for y in Year.query.all()]:
-                    new_week.year = Year.query.filter_by(year=form_year).first()
-                else:
-                    new_year = Year(year=form_year)
-                    db.session.add(new_year)
-                    new_week.year = new_year
-                new_match.week = new_week
-                db.session.add(new_week)
-            db.session.add(new_match)
-            db.session.commit()
+            record_match(new_match, week, form_year)
         return redirect(url_for("admin"))
     return render_template("doubles-ladder-match.html", form=form)
 
@@ -1282,10 +1842,10 @@ def challenge_match():
             new_match = Match(score1=set1_score_1, score2=set1_score_2, set2_score1=set2_score_1, set2_score2=set2_score_2,
                               set3_score1=set3_score_1, set3_score2=set3_score_2, is_challenge=True)
             first_player = Player.query.filter_by(name=player_1).first()
-            new_match.players.append(first_player)
+            new_match.participants.append(PlayerMatch(player=first_player, side=1, slot=1))
             first_player.challenge_matches += 1
             second_player = Player.query.filter_by(name=player_2).first()
-            new_match.players.append(second_player)
+            new_match.participants.append(PlayerMatch(player=second_player, side=2, slot=1))
             second_player.challenge_matches += 1
             new_match.players_order = f"{player_1} {player_2}"
             first_player_sets = 0
@@ -1303,38 +1863,20 @@ def challenge_match():
                     first_player_sets += 1
                 else:
                     second_player_sets += 1
+            # Challenges are decided on the points of the match's own season, not the players' current ones
+            season_points = get_cumulative_standings(form_year)["points"]
+            totals = season_points.as_of(season_points.days)
+            first_points = totals.get(player_1, 0)
+            second_points = totals.get(player_2, 0)
             if first_player_sets > second_player_sets:
-                if first_player.points < second_player.points:
-                    new_match.points_gained = second_player.points - first_player.points
+                if first_points < second_points:
+                    new_match.points_gained = second_points - first_points
                     first_player.challenge_points += new_match.points_gained
-                    first_player.points = second_player.points
             else:
-                if first_player.points > second_player.points:
-                    new_match.points_gained = first_player.points - second_player.points
+                if first_points > second_points:
+                    new_match.points_gained = first_points - second_points
                     second_player.challenge_points += new_match.points_gained
-                    second_player.points = first_player.points
-            yr = Year.query.filter_by(year=form_year).first()
-            if len(yr.weeks) > 0:
-                weeks_in_years = [wk.number for wk in yr.weeks]
-            else:
-                weeks_in_years = []
-            if week in weeks_in_years:
-                new_match.week = Week.query.filter_by(number=week).first()
-            else:
-                if len(Week.query.all()) != 1:
-                    send_week_result(Week.query.all()[-1].number)
-                    send_table(Week.query.all()[-1].number)
-                new_week = Week(number=week, first_saturday=datetime.datetime.now().strftime("%d %B"))
-                if form_year in [y.year for y in Year.query.all()]:
-                    new_week.year = Year.query.filter_by(year=form_year).first()
-                else:
-                    new_year = Year(year=form_year)
-                    db.session.add(new_year)
-                    new_week.year = new_year
-                new_match.week = new_week
-                db.session.add(new_week)
-            db.session.add(new_match)
-            db.session.commit()
+            record_match(new_match, week, form_year)
         return redirect(url_for("admin"))
     return render_template("challenge-match.html", form=form)
 
@@ -1353,6 +1895,7 @@ def add_player():
                 new_player.rank = form.rank.data
             db.session.add(new_player)
             db.session.commit()
+            refresh_standings()
         return redirect(url_for("admin"))
     return render_template("add-player.html", form=form)
 
@@ -1360,15 +1903,18 @@ def add_player():
 @app.route("/matches")
 @admin_only
 def matches():
-    match_list = Match.query.all()
-    no_of_players = [len(match.players) for match in match_list]
-    match_players = [match.players_order.split() for match in match_list]
+    cursor = request.args.get('cursor')
+    match_list, next_cursor = query_match_page(parse_match_cursor(cursor))
+    no_of_players = [len(match.participants) for match in match_list]
+    match_players = [[participant.player.name for participant in match.participants] for match in match_list]
     return render_template(
         "matches.html",
         matches=match_list,
         no_of_players=no_of_players,
         match_players=match_players,
-        length=len(match_list)
+        length=len(match_list),
+        first_page=cursor is None,
+        next_cursor=format_match_cursor(next_cursor)
     )
 
 
@@ -1383,28 +1929,164 @@ def delete_match(match_id):
 @app.route("/get-games", methods=['GET', 'POST'])
 @admin_only
 def get_games():
-    weeks = [" "] + [week.number for week in Week.query.all()]
+    weeks = [" "] + [week.number for week in query_year_weeks()]
     form = WeekForm(week=weeks[-1])
     form.week.choices = weeks
     if form.validate_on_submit():
-        send_week_result(int(form.week.data))
+        enqueue_job("week_result", number=int(form.week.data))
+        db.session.commit()
         flash("Check the official email for what you requested.")
         return redirect(url_for("admin"))
     return render_template('get-games.html', form=form)
 
 
+@app.route("/reports/<name>.png")
+@admin_only
+def download_report(name):
+    if name not in ('results', 'table', 'cwp', *STAT_CHARTS):
+        abort(404)
+    day = request.args.get('week', type=int)
+    year = request.args.get('year', type=int)
+    profile = request.args.get('profile')
+    if name in ('results', 'table') and not get_week(day, year):
+        abort(404)
+    if profile is not None:
+        import reporting
+        if profile not in reporting.CHART_PROFILES:
+            abort(404)
+    filename, data = render_report(name, day, year, profile)
+    return send_file(io.BytesIO(data), mimetype='image/png', as_attachment=True, download_name=filename)
+
+
+@app.route("/days/<int:day>/<kind>.png")
+@app.route("/ladder-games/<int:year>/days/<int:day>/<kind>.png")
+def day_image(day, kind, year=None):
+    if kind not in DAY_IMAGES or not get_week(day, year):
+        abort(404)
+    data = DAY_IMAGES[kind][0](day, year)
+    # The render cache key already changes whenever the image's data does, so it doubles as a strong ETag
+    etag = render_cache.key(kind, [day, data])
+    response = app.response_class(mimetype="image/png")
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+    if request.if_none_match.contains(etag):
+        response.status_code = 304
+        return response
+    response.set_data(render_day_image(kind, day, year, data))
+    return response
+
+
+@app.route("/jobs")
+@admin_only
+def jobs():
+    job_list = Job.query.order_by(Job.id.desc()).limit(50).all()
+    return render_template("jobs.html", jobs=job_list)
+
+
 @app.route("/get-table", methods=['GET', 'POST'])
 @admin_only
 def get_table():
-    weeks = [" "] + [week.number for week in Week.query.all()]
+    weeks = [" "] + [week.number for week in query_year_weeks()]
     form = WeekForm(week=weeks[-1])
     form.week.choices = weeks
     if form.validate_on_submit():
-        send_table(int(form.week.data))
+        enqueue_job("table", day=int(form.week.data))
+        db.session.commit()
         flash("Check the official email for what you requested.")
         return redirect(url_for("admin"))
     return render_template('get-table.html', form=form)
 
 
+# Read-only JSON API, for clients such as the scoreboard display that only need part of a page's data
+API_PAGE_SIZE = 50
+API_MAX_PAGE_SIZE = 200
+
+
+def api_response(**data):
+    """A JSON response that clients can revalidate with If-None-Match instead of downloading it again."""
+    response = jsonify(data)
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def get_api_year():
+    """The season of an API request, ?year= or the current one; 404 if the club has no such season."""
+    year = request.args.get('year', datetime.datetime.now().year, type=int)
+    if Year.query.filter_by(year=year).first() is None:
+        abort(404)
+    return year
+
+
+def match_json(match):
+    sides = ([], [])
+    for participant in match.participants:
+        sides[participant.side - 1].append(participant.player.name)
+    sets = [[match.score1, match.score2]]
+    for score1, score2 in ((match.set2_score1, match.set2_score2), (match.set3_score1, match.set3_score2)):
+        if score1 is not None:
+            sets.append([score1, score2])
+    data = {"id": match.id, "year": match.week.year.year, "day": match.week.number, "sides": sides, "sets": sets}
+    if match.is_challenge:
+        data["challenge"] = True
+        data["points_gained"] = match.points_gained
+    return data
+
+
+@app.route("/api/v1/standings")
+def api_standings():
+    year = get_api_year()
+    days = get_cumulative_standings(year)["points"].days
+    day = request.args.get('day', days, type=int)
+    if not 0 <= day <= days:
+        abort(404)
+    table = get_day_table(day, year)
+    standings = [{"player": player, **row} for player, row in table.items()]
+    return api_response(year=year, day=day, standings=standings)
+
+
+@app.route("/api/v1/days/<int:day>")
+def api_day(day):
+    year = get_api_year()
+    week = query_week_with_matches().join(Year, Week.year_id == Year.id) \
+        .filter(Week.number == day, Year.year == year).first()
+    if week is None:
+        abort(404)
+    return api_response(year=year, day=day, date=week.first_saturday,
+                        matches=[match_json(match) for match in week.matches])
+
+
+@app.route("/api/v1/matches")
+def api_matches():
+    limit = request.args.get('limit', API_PAGE_SIZE, type=int)
+    if not 1 <= limit <= API_MAX_PAGE_SIZE:
+        abort(400)
+    year = request.args.get('year', type=int)
+    matches, cursor = query_match_page(parse_match_cursor(request.args.get('cursor')), limit, year)
+    return api_response(matches=[match_json(match) for match in matches], next_cursor=format_match_cursor(cursor))
+
+
+@app.route("/api/v1/stats/<name>")
+def api_stat(name):
+    if name != 'cwp' and name not in STAT_CHARTS:
+        abort(404)
+    year = get_api_year()
+    if name == 'cwp':
+        players = [{"player": player, "points": list(totals)} for player, totals in get_cwp_series(year).items()]
+        return api_response(name=name, year=year, players=players)
+    title, get_stat = STAT_CHARTS[name]
+    # A list of pairs rather than an object, so the leaderboard order survives
+    return api_response(name=name, year=year, title=title, values=[list(item) for item in get_stat(year).items()])
+
+
+@app.route("/api/v1/h2h")
+def api_h2h():
+    first = Player.query.filter_by(name=request.args.get('p1')).first()
+    second = Player.query.filter_by(name=request.args.get('p2')).first()
+    if first is None or second is None or first.id == second.id:
+        abort(404)
+    return api_response(player1=first.name, player2=second.name, **get_h2h_record(first, second))
+
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,33 @@
+"""indexes for hot queries
+
+Covers week lookups by number (and year), the match -> week and player_match -> match joins, and the job worker's
+queue poll.
+
+Revision ID: 21ec1f478983
+Revises: 9736557a5fc5
+Create Date: 2026-10-17 02:26:45.040759
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '21ec1f478983'
+down_revision = '9736557a5fc5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_week_number_year_id', 'week', ['number', 'year_id'])
+    op.create_index('ix_match_week_id', 'match', ['week_id'])
+    op.create_index('ix_player_match_match_id_side_slot', 'player_match', ['match_id', 'side', 'slot'])
+    op.create_index('ix_job_status_run_at', 'job', ['status', 'run_at'])
+
+
+def downgrade():
+    op.drop_index('ix_job_status_run_at', table_name='job')
+    op.drop_index('ix_player_match_match_id_side_slot', table_name='player_match')
+    op.drop_index('ix_match_week_id', table_name='match')
+    op.drop_index('ix_week_number_year_id', table_name='week')
@@ -0,0 +1,41 @@
+"""pair_stat table
+
+The release step fills it in with ``flask rebuild-pair-stats --if-empty``.
+
+Revision ID: 3109d7a051fe
+Revises: b55629495268
+Create Date: 2026-10-17 02:26:38.699215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3109d7a051fe'
+down_revision = 'b55629495268'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'pair_stat',
+        sa.Column('player1_id', sa.Integer(), nullable=False),
+        sa.Column('player2_id', sa.Integer(), nullable=False),
+        sa.Column('singles_played', sa.Integer(), nullable=False),
+        sa.Column('singles_won1', sa.Integer(), nullable=False),
+        sa.Column('singles_won2', sa.Integer(), nullable=False),
+        sa.Column('doubles_played', sa.Integer(), nullable=False),
+        sa.Column('doubles_won1', sa.Integer(), nullable=False),
+        sa.Column('doubles_won2', sa.Integer(), nullable=False),
+        sa.Column('teammates_played', sa.Integer(), nullable=False),
+        sa.Column('teammates_won', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['player1_id'], ['player.id']),
+        sa.ForeignKeyConstraint(['player2_id'], ['player.id']),
+        sa.PrimaryKeyConstraint('player1_id', 'player2_id')
+    )
+
+
+def downgrade():
+    op.drop_table('pair_stat')
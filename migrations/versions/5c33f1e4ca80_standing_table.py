@@ -0,0 +1,40 @@
+"""standing table
+
+The release step fills it in with ``flask rebuild-standings --missing``.
+
+Revision ID: 5c33f1e4ca80
+Revises: 3109d7a051fe
+Create Date: 2026-10-17 02:26:40.850303
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c33f1e4ca80'
+down_revision = '3109d7a051fe'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'standing',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('year_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Integer(), nullable=False),
+        sa.Column('player_id', sa.Integer(), nullable=False),
+        sa.Column('points', sa.Integer(), nullable=False),
+        sa.Column('games', sa.Integer(), nullable=False),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column('shift', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['player_id'], ['player.id']),
+        sa.ForeignKeyConstraint(['year_id'], ['year.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('year_id', 'day', 'player_id')
+    )
+
+
+def downgrade():
+    op.drop_table('standing')
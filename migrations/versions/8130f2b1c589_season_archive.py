@@ -0,0 +1,33 @@
+"""season archive
+
+Revision ID: 8130f2b1c589
+Revises: 21ec1f478983
+Create Date: 2026-10-17 02:33:38.452796
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8130f2b1c589'
+down_revision = '21ec1f478983'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'season_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('year_id', sa.Integer(), nullable=False),
+        sa.Column('data', sa.Text(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['year_id'], ['year.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('year_id')
+    )
+
+
+def downgrade():
+    op.drop_table('season_archive')
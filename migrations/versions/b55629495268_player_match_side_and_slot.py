@@ -0,0 +1,53 @@
+"""player_match side and slot
+
+Fills the columns in from each match's players_order.
+
+Revision ID: b55629495268
+Revises: f793f6cc794c
+Create Date: 2026-10-17 02:26:36.531483
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b55629495268'
+down_revision = 'f793f6cc794c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('player_match') as batch_op:
+        batch_op.add_column(sa.Column('side', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('slot', sa.Integer(), nullable=True))
+
+    player = sa.table('player', sa.column('id'), sa.column('name'))
+    match = sa.table('match', sa.column('id'), sa.column('players_order'))
+    player_match = sa.table('player_match', sa.column('match_id'), sa.column('player_id'), sa.column('side'),
+                            sa.column('slot'))
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(player_match.c.match_id, player_match.c.player_id, player.c.name, match.c.players_order)
+        .join(player, player.c.id == player_match.c.player_id)
+        .join(match, match.c.id == player_match.c.match_id)
+        .where(player_match.c.side.is_(None))
+    ).all()
+    for match_id, player_id, name, players_order in rows:
+        match_players = (players_order or '').split()
+        if name not in match_players:
+            continue
+        team_size = max(len(match_players) // 2, 1)
+        index = match_players.index(name)
+        bind.execute(
+            player_match.update()
+            .where(player_match.c.match_id == match_id, player_match.c.player_id == player_id)
+            .values(side=index // team_size + 1, slot=index % team_size + 1)
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('player_match') as batch_op:
+        batch_op.drop_column('slot')
+        batch_op.drop_column('side')
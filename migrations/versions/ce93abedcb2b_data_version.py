@@ -0,0 +1,30 @@
+"""data version
+
+Revision ID: ce93abedcb2b
+Revises: 8130f2b1c589
+Create Date: 2026-10-17 03:07:00.755293
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'ce93abedcb2b'
+down_revision = '8130f2b1c589'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    data_version = op.create_table(
+        'data_version',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('value', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.bulk_insert(data_version, [{'id': 1, 'value': 0}])
+
+
+def downgrade():
+    op.drop_table('data_version')
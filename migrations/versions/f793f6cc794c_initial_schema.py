@@ -0,0 +1,100 @@
+"""initial schema
+
+Databases created before migrations were introduced already have these tables (from db.create_all()), so
+each one is only created when it is missing and ``flask db upgrade`` works on old and new databases alike.
+
+Revision ID: f793f6cc794c
+Revises: 
+Create Date: 2026-10-17 02:26:34.322936
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f793f6cc794c'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    if 'users' not in tables:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(length=250), nullable=False),
+            sa.Column('password', sa.String(length=250), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if 'year' not in tables:
+        op.create_table(
+            'year',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('year', sa.Integer(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('year')
+        )
+    if 'player' not in tables:
+        op.create_table(
+            'player',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('name', sa.String(length=250), nullable=False),
+            sa.Column('full_name', sa.String(length=250), nullable=False),
+            sa.Column('rank', sa.Integer(), nullable=True),
+            sa.Column('points', sa.Integer(), nullable=False),
+            sa.Column('challenge_points', sa.Integer(), nullable=False),
+            sa.Column('challenge_matches', sa.Integer(), nullable=False),
+            sa.Column('position', sa.Integer(), nullable=True),
+            sa.Column('shift', sa.Integer(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('full_name'),
+            sa.UniqueConstraint('name')
+        )
+    if 'week' not in tables:
+        op.create_table(
+            'week',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('number', sa.Integer(), nullable=False),
+            sa.Column('first_saturday', sa.String(length=250), nullable=False),
+            sa.Column('year_id', sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(['year_id'], ['year.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if 'match' not in tables:
+        op.create_table(
+            'match',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('players_order', sa.String(length=250), nullable=False),
+            sa.Column('score1', sa.Integer(), nullable=False),
+            sa.Column('score2', sa.Integer(), nullable=False),
+            sa.Column('set2_score1', sa.Integer(), nullable=True),
+            sa.Column('set2_score2', sa.Integer(), nullable=True),
+            sa.Column('set3_score1', sa.Integer(), nullable=True),
+            sa.Column('set3_score2', sa.Integer(), nullable=True),
+            sa.Column('week_id', sa.Integer(), nullable=True),
+            sa.Column('is_challenge', sa.Boolean(), nullable=False),
+            sa.Column('points_gained', sa.Integer(), nullable=True),
+            sa.ForeignKeyConstraint(['week_id'], ['week.id']),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if 'player_match' not in tables:
+        op.create_table(
+            'player_match',
+            sa.Column('player_id', sa.Integer(), nullable=False),
+            sa.Column('match_id', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['match_id'], ['match.id']),
+            sa.ForeignKeyConstraint(['player_id'], ['player.id']),
+            sa.PrimaryKeyConstraint('player_id', 'match_id')
+        )
+
+
+def downgrade():
+    op.drop_table('player_match')
+    op.drop_table('match')
+    op.drop_table('week')
+    op.drop_table('player')
+    op.drop_table('year')
+    op.drop_table('users')
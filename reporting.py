@@ -0,0 +1,309 @@
+"""Charts and images for the club's emails and downloads.
+
+matplotlib, NumPy and Pillow are slow to import and only the report jobs and image endpoints need them, so
+main.py imports this module inside the functions that render and hands it plain data.
+"""
+import io
+import math
+import numpy as np
+import random
+from contextlib import contextmanager
+from functools import lru_cache
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image, ImageDraw, ImageFont
+
+COLORS = ['#FFF200', '#F7FF00', '#E1FF00', '#CCFF00', '#B7FF00', '#A2FF00', '#8CFF00']
+
+# Chart output sizes: figsize in inches and dpi, so fonts given in points keep their proportions in every profile
+CHART_PROFILES = {
+    'email': {'figsize': (16, 10), 'dpi': 120},   # 1920x1200
+    'social': {'figsize': (16, 9), 'dpi': 120},   # 1920x1080
+    'print': {'figsize': (16, 10), 'dpi': 300},   # 4800x3000
+}
+
+
+@contextmanager
+def chart(profile):
+    """Yields (figure, axes) drawn with Agg and never registered with pyplot, and clears the figure afterwards.
+
+    Nothing is kept in module or pyplot state, so a long-running worker frees every chart once it is saved, even if
+    drawing it fails part way through.
+    """
+    options = CHART_PROFILES[profile]
+    fig = Figure(figsize=options['figsize'], dpi=options['dpi'], facecolor=random.choice(COLORS))
+    FigureCanvasAgg(fig)
+    try:
+        yield fig, fig.add_subplot()
+    finally:
+        fig.clear()
+
+
+def figure_png_bytes(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png')
+    return buffer.getvalue()
+
+
+def image_png_bytes(img):
+    buffer = io.BytesIO()
+    img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def render_stat(stat: dict, title: str, profile='email'):
+    dic = {}
+    n = 0
+    for i in stat:
+        n = n + 1
+        if n == 5:
+            fifth = stat[i]
+    n = 0
+    for i in stat:
+        if n > 5:
+            if stat[i] == fifth:
+                dic[i] = stat[i]
+            else:
+                break
+        dic[i] = stat[i]
+        n = n + 1
+
+    with chart(profile) as (fig, ax):
+        ax.tick_params(axis='x', labelsize=15, labelrotation=15)
+        ax.tick_params(axis='y', labelsize=20)
+        ax.set_title(title, fontsize=25)
+        for player in dic:
+            bar = ax.bar(player, height=dic[player], color='#000000')
+            ax.bar_label(bar, padding=3, fontsize=20)
+        return figure_png_bytes(fig)
+
+
+def render_cwp(series, profile='email'):
+    """Plots each player's cumulative points, ``series`` mapping names to their running totals from Day 0."""
+    days = len(next(iter(series.values()), []))
+    labels = [''] + [f'Day {i}' for i in range(1, days)]
+    with chart(profile) as (fig, ax):
+        ax.tick_params(labelsize=20)
+        ax.set_xlabel('Weeks', fontsize=25)
+        ax.set_ylabel('Points', fontsize=25)
+        for totals in series.values():
+            ax.plot(labels, totals, linewidth=3)
+        ax.set_xlim(left=0)
+        ax.set_ylim(bottom=0)
+        ax.legend(list(series), fontsize=17)
+        return figure_png_bytes(fig)
+
+
+@lru_cache(maxsize=None)
+def get_font(path, size):
+    """Loads each (font file, size) once per process and shares it between every render."""
+    return ImageFont.truetype(path, size)
+
+
+@lru_cache(maxsize=1)
+def _measuring_draw():
+    return ImageDraw.Draw(Image.new('RGB', (1, 1)))
+
+
+@lru_cache(maxsize=4096)
+def text_size(text, font):
+    """Memoized ``draw.textsize``: the size of a piece of text only depends on the text and the font."""
+    return _measuring_draw().textsize(text, font=font)
+
+
+@lru_cache(maxsize=16)
+def _render_gradient(size, from_color, to_color, angle):
+    width, height = size
+    x = np.arange(width, dtype=np.float64)[np.newaxis, :, np.newaxis]
+    y = np.arange(height, dtype=np.float64)[:, np.newaxis, np.newaxis]
+    frac = (math.cos(angle) * x + math.sin(angle) * y) / width
+    pixels = np.array(from_color) * (1 - frac) + np.array(to_color) * frac
+    return Image.fromarray(np.clip(pixels.astype(np.int64), 0, 255).astype(np.uint8), 'RGB')
+
+
+def render_gradient(size, from_color, to_color, angle):
+    """Returns a new image filled with a linear gradient running from ``from_color`` to ``to_color`` at ``angle``
+    radians. The gradient itself is built once per (size, colors, angle) and copied on later calls."""
+    return _render_gradient(tuple(size), tuple(from_color), tuple(to_color), angle).copy()
+
+
+def draw_week_result(number, matches):
+    results = ""
+    for match in matches:
+        match_players = match.players
+        if not match.is_challenge:
+            if len(match_players) == 4:
+                results = results + f"{match_players[0]}/{match_players[1]} {match.score1} - {match.score2} {match_players[2]}/{match_players[3]}\n\n"
+            elif len(match_players) == 2:
+                results = results + f"{match_players[0]} {match.score1} - {match.score2} {match_players[1]}\n\n"
+
+    if len(matches) < 20:
+        size = (800, 1200)
+    else:
+        size = (800 + (34 * (len(matches) - 19)), 1200 + (51 * (len(matches) - 19)))
+
+    from_color = (69, 255, 0)
+    to_color = (255, 242, 0)
+    angle = math.pi * 0 / 180
+
+    img = render_gradient(size, from_color, to_color, angle)
+    draw = ImageDraw.Draw(img)
+    w, h = img.size
+
+    # Heading
+    text = f"DAY {number} LADDER GAMES"
+    heading = get_font("fonts/RadikalTrial-Black-BF642254c139184.otf", 50)
+    text_width, text_height = text_size(text, font=heading)
+    text_x = (w // 2) - text_width // 2
+    text_y = 100 - text_height // 2
+    draw.text((text_x, text_y), text=text, fill=(0, 0, 0), font=heading)
+
+    # Matches
+    score_font = get_font("fonts/arialbd.ttf", 24)
+    font = get_font("fonts/RadikalTrial-Medium-BF642254c12fd7b.otf", 24)
+    for i in range(len(matches)):
+        match = matches[i]
+        match_players = match.players
+        if not match.is_challenge:
+            draw.rectangle((((w // 8), 200 + (i * 50)), ((w - (w // 8)), 244 + (i * 50))), fill=(255, 255, 255))
+            draw.rectangle(((((w // 2) - 38), 200 + (i * 50)), (((w // 2) + 38), 244 + (i * 50))), fill=(0, 0, 0))
+
+            score = f"{match.score1} - {match.score2}"
+            score_w, score_h = text_size(score, font=score_font)
+            score_x = (w // 2) - score_w // 2
+            score_y = (222 + (i * 50)) - score_h // 2
+            draw.text((score_x, score_y), text=score, fill=(255, 255, 255), font=score_font)
+
+            if len(match_players) == 4:
+                left = f'{match_players[0]}  {match_players[1]}'
+                right = f'{match_players[2]} {match_players[3]}'
+            else:
+                left = match_players[0]
+                right = match_players[1]
+
+            left_w, left_h = text_size(left, font=font)
+            left_x = ((w // 2) - 50) - left_w
+            left_contains_bottom = 'g' in left or 'j' in left or 'p' in left or 'q' in left or 'y' in left
+            if left_contains_bottom:
+                left_y = (222 + (i * 50)) - left_h // 2
+            else:
+                left_y = (233 + (i * 50)) - left_h
+            draw.text((left_x, left_y), text=left, fill=(0, 0, 0), font=font)
+
+            right_h = text_size(right, font=font)[1]
+            right_contains_bottom = 'g' in right or 'j' in right or 'p' in right or 'q' in right or 'y' in right
+            if right_contains_bottom:
+                right_y = (222 + (i * 50)) - right_h // 2
+            else:
+                right_y = (233 + (i * 50)) - right_h
+            draw.text((((w // 2) + 50), right_y), text=right, fill=(0, 0, 0), font=font)
+
+            if len(match_players) == 4:
+                slash = '/'
+                l_slash_w, l_slash_h = text_size(slash, font=score_font)
+                size1 = text_size(match_players[1], font=font)[0]
+                l_slash_x = ((w // 2) - 50) - (size1 + l_slash_w)
+                if left_contains_bottom:
+                    l_slash_y = (222 + (i * 50)) - l_slash_h // 2
+                else:
+                    l_slash_y = (233 + (i * 50)) - l_slash_h
+                draw.text((l_slash_x, l_slash_y), text=slash, fill=(0, 0, 0), font=score_font)
+
+                r_slash_h = text_size(slash, font=score_font)[1]
+                size2 = text_size(match_players[2], font=font)[0]
+                r_slash_x = ((w // 2) + 50) + size2
+                if right_contains_bottom:
+                    r_slash_y = (222 + (i * 50)) - r_slash_h // 2
+                else:
+                    r_slash_y = (233 + (i * 50)) - r_slash_h
+                draw.text((r_slash_x, r_slash_y), text=slash, fill=(0, 0, 0), font=score_font)
+
+            if match.score1 > match.score2:
+                draw.polygon((((w // 8), 212 + (i * 50)), (((w // 8) + 10), 222 + (i * 50)), ((w // 8), 232 + (i * 50))), fill=(0, 0, 0), outline=(0, 0, 0))
+            else:
+                draw.polygon((((w - (w // 8)), 212 + (i * 50)), ((w - (w // 8) - 10), 222 + (i * 50)), ((w - (w // 8)), 232 + (i * 50))), fill=(0, 0, 0), outline=(0, 0, 0))
+
+    return image_png_bytes(img)
+
+
+def draw_table(day, table):
+    if len(table) < 20:
+        size = (900, 1350)
+    else:
+        size = (900 + ((len(table) - 20) * 34), 1350 + ((len(table) - 20) * 51))
+
+    from_color = (0, 241, 255)
+    to_color = (214, 0, 255)
+    angle = math.pi * 15 / 180
+
+    img = render_gradient(size, from_color, to_color, angle)
+    draw = ImageDraw.Draw(img)
+    w, h = img.size
+
+    # Heading
+    text = f"DAY {day} STANDINGS"
+    heading = get_font("fonts/RadikalTrial-Black-BF642254c139184.otf", 50)
+    text_width, text_height = text_size(text, font=heading)
+    text_x = (w // 2) - text_width // 2
+    text_y = 100 - text_height // 2
+    draw.text((text_x, text_y), text=text, fill=(0, 0, 0), font=heading)
+
+    heading = get_font("fonts/RadikalTrial-Black-BF642254c139184.otf", 30)
+    text_width, text_height = text_size("Games", font=heading)
+    text_x = ((w - (w // 9)) - 160) - text_width // 2
+    text_y = 170 - text_height // 2
+    draw.text((text_x, text_y), text="Games", fill=(0, 0, 0), font=heading)
+
+    text_width, text_height = text_size("Pts", font=heading)
+    text_x = ((w - (w // 9)) - 50) - text_width // 2
+    text_y = 170 - text_height // 2
+    draw.text((text_x, text_y), text="Pts", fill=(0, 0, 0), font=heading)
+
+    # Players
+    numbers_font = get_font("fonts/arialbd.ttf", 24)
+    font = get_font("fonts/RadikalTrial-Medium-BF642254c12fd7b.otf", 24)
+    i = 0
+    for player in table:
+        draw.rectangle((((w // 9), 200 + (i * 50)), ((w - (w // 9)), 244 + (i * 50))), fill=(255, 255, 255))
+
+        pos = str(table[player]['position'])
+        pos_w, pos_h = text_size(pos, font=numbers_font)
+        pos_x = ((w // 9) + 22) - pos_w // 2
+        pos_y = 222 + (i * 50) - pos_h // 2
+        draw.text((pos_x, pos_y), text=pos, fill=(0, 0, 0), font=numbers_font)
+
+        for y in range(200 + (i * 50), 245 + (i * 50)):
+            color = tuple(
+                int(img.getpixel((((w // 9) + 44), 197 + (i * 50)))[a] + ((255, 255, 255)[a] - img.getpixel((((w // 9) + 44), 197 + (i * 50)))[a]) * (y - (200 + (i * 50))) / ((244 + (i * 50)) - (200 + (i * 50)))) for a in range(3)
+            )
+            draw.line(((((w // 9) + 44), y), (((w // 9) + 47), y)), fill=color)
+
+        if table[player]['shift'] > 0:
+            draw.polygon(((((w // 9) + 68), 220 + (i * 50)), (((w // 9) + 80), 220 + (i * 50)), (((w // 9) + 74), 212 + (i * 50))), fill=(0, 255, 0), outline=(0, 255, 0))
+        else:
+            draw.polygon(((((w // 9) + 68), 220 + (i * 50)), (((w // 9) + 80), 220 + (i * 50)), (((w // 9) + 74), 212 + (i * 50))), fill=(200, 200, 200), outline=(200, 200, 200))
+
+        if table[player]['shift'] < 0:
+            draw.polygon(((((w // 9) + 68), 224 + (i * 50)), (((w // 9) + 80), 224 + (i * 50)), (((w // 9) + 74), 232 + (i * 50))), fill=(255, 0, 0), outline=(255, 0, 0))
+        else:
+            draw.polygon(((((w // 9) + 68), 224 + (i * 50)), (((w // 9) + 80), 224 + (i * 50)), (((w // 9) + 74), 232 + (i * 50))), fill=(200, 200, 200), outline=(200, 200, 200))
+
+        name_h = text_size(player, font=font)[1]
+        name_y = 222 + (i * 50) - name_h // 2
+        draw.text((((w // 9) + 100), name_y), text=player, fill=(0, 0, 0), font=font)
+
+        text_width, text_height = text_size(str(table[player]['games']), font=numbers_font)
+        text_x = ((w - (w // 9)) - 160) - text_width // 2
+        text_y = 222 + (i * 50) - text_height // 2
+        draw.text((text_x, text_y), text=str(table[player]['games']), fill=(0, 0, 0), font=numbers_font)
+
+        text_width, text_height = text_size(str(table[player]['points']), font=numbers_font)
+        text_x = ((w - (w // 9)) - 50) - text_width // 2
+        text_y = 222 + (i * 50) - text_height // 2
+        draw.text((text_x, text_y), text=str(table[player]['points']), fill=(0, 0, 0), font=numbers_font)
+
+        i = i + 1
+
+    draw.rectangle((((w // 9), 395), ((w - (w // 9)), 400)), fill=(3, 1, 61))
+    draw.rectangle((((w // 9), 595), ((w - (w // 9)), 600)), fill=(3, 1, 61))
+    return image_png_bytes(img)
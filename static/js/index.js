@@ -54,3 +54,12 @@ $('.stat-toggle').click(function(){
     $(".h2h-div").not(targetBox).addClass("hide");
     $(targetBox).removeClass("hide");
 });
+
+//Older days of the Games tab, fetched as a fragment that brings its own button for the days before it
+$(document).on("click", ".load-older-days", function () {
+    var button = $(this).parent();
+    $.get($(this).attr("href"), function (html) {
+        button.replaceWith(html);
+    });
+    return false;
+});
@@ -0,0 +1,107 @@
+import datetime
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+# main reads its configuration when it is imported, so point it at a scratch database and directories first
+TMP_DIR = tempfile.mkdtemp(prefix="ladder-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TMP_DIR, 'ladder.db')}"
+os.environ["SECRET_KEY"] = "test"
+os.environ["MAIL_BACKEND"] = "file"
+os.environ["MAIL_FILE_DIR"] = os.path.join(TMP_DIR, "sent-mail")
+os.environ["RENDER_CACHE_DIR"] = os.path.join(TMP_DIR, "render-cache")
+os.environ["CACHE_PATH"] = os.path.join(TMP_DIR, "page-cache")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+YEAR = datetime.datetime.now().year
+PLAYERS = ["Ade", "Bola", "Chi", "Dayo", "Emeka", "Femi"]
+
+
+@pytest.fixture
+def app():
+    main.app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    with main.app.app_context():
+        main.db.drop_all()
+        main.db.create_all()
+        main.db.session.add(main.User(username="admin", password=generate_password_hash("secret")))
+        for name in PLAYERS:
+            main.db.session.add(main.Player(name=name, full_name=f"{name} Full", points=0, challenge_points=0,
+                                            challenge_matches=0))
+        main.db.session.add(main.Year(year=YEAR))
+        main.db.session.commit()
+    # Per-worker caches would otherwise carry one test's season into the next
+    main._cumulative_standings.clear()
+    main._cache = None
+    yield main.app
+    with main.app.app_context():
+        main.db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin(client):
+    response = client.post("/login", data={"username": "admin", "password": "secret"})
+    assert response.status_code == 302
+    return client
+
+
+class Ladder:
+    """Records matches through the admin forms, the way the club does."""
+
+    def __init__(self, admin):
+        self.admin = admin
+
+    def singles(self, player_1, player_2, score_1, score_2, day, year=YEAR):
+        self._post("/ladder-match-singles", player_1=player_1, player_2=player_2, score_1=score_1, score_2=score_2,
+                   week=day, year=year)
+
+    def doubles(self, players, score_1, score_2, day, year=YEAR):
+        self._post("/ladder-match-doubles", player_1=players[0], player_2=players[1], player_3=players[2],
+                   player_4=players[3], score_1=score_1, score_2=score_2, week=day, year=year)
+
+    def challenge(self, player_1, player_2, sets, day, year=YEAR):
+        (set1_1, set1_2), (set2_1, set2_2) = sets
+        self._post("/challenge-match", player_1=player_1, player_2=player_2, set1_score1=set1_1, set1_score2=set1_2,
+                   set2_score1=set2_1, set2_score2=set2_2, week=day, year=year)
+
+    def play_day(self, day):
+        self.singles("Ade", "Bola", 6, 3, day)
+        self.doubles(["Chi", "Dayo", "Emeka", "Femi"], 6, 5, day)
+        self.singles("Chi", "Femi", 5, 6, day)
+
+    def _post(self, url, **data):
+        response = self.admin.post(url, data=data)
+        assert response.status_code == 302
+
+
+@pytest.fixture
+def ladder(admin):
+    return Ladder(admin)
+
+
+@contextmanager
+def recorded_statements():
+    """Collects the SQL statements run inside the block."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with main.app.app_context():
+        engine = main.db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
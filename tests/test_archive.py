@@ -0,0 +1,54 @@
+"""Past seasons are archived by the worker once the next season starts; viewing one never writes."""
+import main
+from conftest import YEAR, recorded_statements
+
+PAST_YEAR = YEAR - 2
+
+
+def play_past_season(ladder):
+    for day in (1, 2):
+        ladder.singles("Ade", "Bola", 6, 3, day, year=PAST_YEAR)
+        ladder.singles("Chi", "Dayo", 4, 6, day, year=PAST_YEAR)
+    # The first match of the following season
+    ladder.singles("Ade", "Chi", 6, 2, 1, year=PAST_YEAR + 1)
+
+
+def count_archives(app):
+    with app.app_context():
+        return main.SeasonArchive.query.count()
+
+
+def test_viewing_an_unarchived_season_writes_nothing(app, ladder):
+    play_past_season(ladder)
+    with recorded_statements() as statements:
+        response = app.test_client().get(f"/ladder-games/{PAST_YEAR}")
+    assert response.status_code == 200
+    assert b"Bola" in response.data
+    writes = [statement for statement in statements if statement.split()[0] in ("INSERT", "UPDATE", "DELETE")]
+    assert writes == []
+    assert count_archives(app) == 0
+
+
+def test_worker_archives_the_season_before_a_new_one(app, ladder):
+    play_past_season(ladder)
+    with app.app_context():
+        assert main.Job.query.filter_by(kind="archive_season").one().payload == f'{{"year_number": {PAST_YEAR}}}'
+    result = app.test_cli_runner().invoke(args=["run-jobs", "--once"])
+    assert result.exit_code == 0, result.output
+    assert count_archives(app) == 1
+    live = app.test_client().get(f"/ladder-games/{PAST_YEAR}")
+    assert live.status_code == 200
+    assert b"Bola" in live.data
+
+
+def test_unknown_past_season_is_not_found(client):
+    assert client.get(f"/ladder-games/{PAST_YEAR}").status_code == 404
+
+
+def test_backfilling_an_older_season_queues_nothing(app, ladder):
+    for day in (1, 2):
+        ladder.play_day(day)
+    ladder.singles("Ade", "Bola", 6, 3, 1, year=YEAR - 3)
+    with app.app_context():
+        assert main.Job.query.all() == []
+        assert main.Year.query.filter_by(year=YEAR - 3).one().weeks[0].matches[0].players_order == "Ade Bola"
@@ -0,0 +1,58 @@
+"""The cross-request cache: shared data version, expiry, and nothing per-visitor in what is cached."""
+import os
+import re
+import subprocess
+import sys
+
+import main
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Another worker or a CLI command recording a change, in a process of its own
+ADD_PLAYER = """
+import main
+with main.app.app_context():
+    main.db.session.add(main.Player(name="Gbenga", full_name="Gbenga Full", points=0, challenge_points=0,
+                                    challenge_matches=0))
+    main.db.session.commit()
+"""
+
+
+def test_change_recorded_by_another_process_shows_on_the_next_view(app, ladder):
+    ladder.play_day(1)
+    visitor = app.test_client()
+    assert b"Gbenga" not in visitor.get("/ladder-games").data
+    subprocess.run([sys.executable, "-c", ADD_PLAYER], check=True, cwd=ROOT)
+    assert b"Gbenga" in visitor.get("/ladder-games").data
+
+
+def test_rolled_back_change_leaves_the_version_alone(app):
+    with app.app_context():
+        version = main.get_data_version()
+        main.db.session.add(main.Player(name="Gbenga", full_name="Gbenga Full", points=0, challenge_points=0,
+                                        challenge_matches=0))
+        main.db.session.flush()
+        main.db.session.rollback()
+        assert main.get_data_version() == version
+
+
+def test_each_visitor_gets_their_own_csrf_token(app, ladder):
+    ladder.play_day(1)
+    app.config["WTF_CSRF_ENABLED"] = True
+    try:
+        tokens = [re.search(rb'name="csrf_token" type="hidden" value="([^"]+)"', app.test_client().get(
+            "/ladder-games").data).group(1) for _ in range(2)]
+    finally:
+        app.config["WTF_CSRF_ENABLED"] = False
+    assert tokens[0] != tokens[1]
+
+
+def test_memory_cache_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(main.time, "monotonic", lambda: now[0])
+    cache = main.MemoryCache(max_entries=4, ttl=60)
+    cache.set("standings", [1, 2, 3])
+    now[0] += 59
+    assert cache.get("standings") == [1, 2, 3]
+    now[0] += 2
+    assert cache.get("standings") is None
@@ -0,0 +1,21 @@
+"""The app's hot queries are served by the indexes declared for them."""
+import pytest
+
+import main
+
+# Each hot query with the index that should serve it
+HOT_QUERIES = {
+    "ix_week_number_year_id": lambda: main.Week.query.filter_by(number=1, year_id=1),
+    "ix_match_week_id": lambda: main.Match.query.filter_by(week_id=1),
+    "ix_player_match_match_id_side_slot":
+        lambda: main.PlayerMatch.query.filter_by(match_id=1).order_by(main.PlayerMatch.side, main.PlayerMatch.slot),
+    "ix_job_status_run_at": lambda: main.Job.query.filter_by(status="pending").order_by(main.Job.run_at),
+}
+
+
+@pytest.mark.parametrize("index", HOT_QUERIES)
+def test_hot_query_uses_its_index(app, index):
+    with app.app_context():
+        sql = HOT_QUERIES[index]().statement.compile(main.db.engine, compile_kwargs={"literal_binds": True})
+        plan = main.db.session.execute(main.db.text(f"EXPLAIN QUERY PLAN {sql}")).all()
+    assert index in "\n".join(str(row[-1]) for row in plan)
@@ -0,0 +1,45 @@
+"""The job queue: a new day queues the previous day's digest, sent as one email, and a job that keeps killing the
+worker is given up on."""
+import email
+import os
+
+import main
+
+
+def test_new_day_sends_previous_day_as_one_digest(app, ladder, tmp_path):
+    app.config["MAIL_FILE_DIR"] = str(tmp_path)
+    main._mail_transport = None
+    for day in (1, 2, 3):
+        ladder.play_day(day)
+    with app.app_context():
+        assert [(job.kind, job.payload) for job in main.Job.query.order_by(main.Job.id)] == [
+            ("weekly_digest", f'{{"day": 2, "year": {main.datetime.datetime.now().year}}}')
+        ]
+    result = app.test_cli_runner().invoke(args=["run-jobs", "--once"])
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        assert [job.status for job in main.Job.query] == ["done"]
+    sent = os.listdir(tmp_path)
+    assert len(sent) == 1
+    with open(tmp_path / sent[0]) as f:
+        message = email.message_from_file(f)
+    assert message["Subject"] == "DAY 2 LADDER GAMES DIGEST"
+    attachments = [part.get_filename() for part in message.walk() if part.get_filename()]
+    assert attachments == ["day2_ladder_games.png", "day2_table.png", "most_points_in_a_day.png",
+                           "best_points_per_game_ratio.png", "best_ladder_games_win_ratio.png",
+                           "most_ladder_game_bagels.png", "cwp.png"]
+    main._mail_transport = None
+
+
+def test_job_that_keeps_killing_the_worker_ends_up_failed(app):
+    long_ago = main.datetime.datetime.now() - main.datetime.timedelta(hours=1)
+    with app.app_context():
+        job = main.enqueue_job("table", day=1)
+        job.status, job.attempts, job.updated_at = "running", 4, long_ago
+        main.db.session.commit()
+        # The fifth attempt is claimed, and the worker dies again before run_job() can record it
+        assert main.claim_next_job().id == job.id
+        job.updated_at = long_ago
+        main.db.session.commit()
+        assert main.claim_next_job() is None
+        assert main.db.session.get(main.Job, job.id).status == "failed"
@@ -0,0 +1,62 @@
+"""The release step brings a database from before player sides, pair stats and standings fully up to date."""
+import datetime
+import os
+import sqlite3
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+YEAR = datetime.datetime.now().year
+
+
+def flask(env, *args):
+    result = subprocess.run(["flask", "--app", "main", *args], capture_output=True, text=True, cwd=ROOT, env=env)
+    assert result.returncode == 0, result.stderr[-2000:]
+
+
+def release_command():
+    with open(os.path.join(ROOT, "Procfile")) as procfile:
+        for line in procfile:
+            process, _, command = line.partition(":")
+            if process == "release":
+                return command.strip()
+
+
+def test_release_fills_in_player_sides_pair_stats_and_standings(tmp_path):
+    database = tmp_path / "ladder.db"
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{database}", SECRET_KEY="test", MAIL_BACKEND="file",
+               MAIL_FILE_DIR=str(tmp_path / "sent-mail"), RENDER_CACHE_DIR=str(tmp_path / "render-cache"),
+               CACHE_PATH=str(tmp_path / "page-cache"))
+    flask(env, "db", "upgrade", "f793f6cc794c")
+    with sqlite3.connect(database) as connection:
+        for player_id, name in enumerate(["Ade", "Bola", "Chi", "Dayo"], start=1):
+            connection.execute("INSERT INTO player (id, name, full_name, points, challenge_points, challenge_matches) "
+                               "VALUES (?, ?, ?, 0, 0, 0)", (player_id, name, f"{name} Full"))
+        connection.execute("INSERT INTO year (id, year) VALUES (1, ?)", (YEAR,))
+        connection.execute("INSERT INTO week (id, number, first_saturday, year_id) VALUES (1, 1, '01 May', 1)")
+        connection.execute("INSERT INTO match (id, players_order, score1, score2, week_id, is_challenge) "
+                           "VALUES (1, 'Bola Ade', 6, 3, 1, 0), (2, 'Ade Bola', 6, 2, 1, 0), "
+                           "(3, 'Ade Chi Bola Dayo', 4, 6, 1, 0)")
+        connection.execute("INSERT INTO player_match (player_id, match_id) "
+                           "VALUES (1, 1), (2, 1), (1, 2), (2, 2), (1, 3), (2, 3), (3, 3), (4, 3)")
+
+    subprocess.run(release_command(), shell=True, check=True, capture_output=True, cwd=ROOT, env=env)
+
+    with sqlite3.connect(database) as connection:
+        sides = connection.execute("SELECT match_id, player_id, side, slot FROM player_match "
+                                   "ORDER BY match_id, player_id").fetchall()
+        pair_stats = connection.execute("SELECT * FROM pair_stat ORDER BY player1_id, player2_id").fetchall()
+        standings = connection.execute("SELECT player.name, standing.points, standing.games, standing.position "
+                                       "FROM standing JOIN player ON player.id = standing.player_id "
+                                       "WHERE day = 1 ORDER BY standing.position").fetchall()
+    assert sides == [(1, 1, 2, 1), (1, 2, 1, 1), (2, 1, 1, 1), (2, 2, 2, 1), (3, 1, 1, 1), (3, 2, 2, 1),
+                     (3, 3, 1, 2), (3, 4, 2, 2)]
+    # player1_id, player2_id, singles played/won1/won2, doubles played/won1/won2, teammates played/won
+    assert pair_stats == [
+        (1, 2, 2, 1, 1, 1, 0, 1, 0, 0),
+        (1, 3, 0, 0, 0, 0, 0, 0, 1, 0),
+        (1, 4, 0, 0, 0, 1, 0, 1, 0, 0),
+        (2, 3, 0, 0, 0, 1, 1, 0, 0, 0),
+        (2, 4, 0, 0, 0, 0, 0, 0, 1, 1),
+        (3, 4, 0, 0, 0, 1, 0, 1, 0, 0),
+    ]
+    assert standings == [("Bola", 14, 3, 1), ("Ade", 13, 3, 2), ("Dayo", 6, 1, 3), ("Chi", 4, 1, 4)]
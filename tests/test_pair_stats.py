@@ -0,0 +1,31 @@
+"""Head-to-head records, kept up to date match by match and rebuilt from scratch, count every match."""
+import main
+
+ADE_BOLA = {"singles_played": 3, "singles_won1": 2, "singles_won2": 1, "doubles_played": 1, "doubles_won1": 0,
+            "doubles_won2": 1, "teammates_played": 1, "teammates_won": 1}
+
+
+def record_ade_and_bola(ladder):
+    for score_1, score_2 in [(6, 3), (6, 2), (2, 6)]:
+        ladder.singles("Ade", "Bola", score_1, score_2, 1)
+    ladder.doubles(["Ade", "Bola", "Chi", "Dayo"], 6, 4, 1)
+    ladder.doubles(["Ade", "Chi", "Bola", "Dayo"], 3, 6, 1)
+
+
+def ade_bola_counts(app):
+    with app.app_context():
+        ade, bola = (main.Player.query.filter_by(name=name).one().id for name in ("Ade", "Bola"))
+        stat = main.db.session.get(main.PairStat, (ade, bola))
+        return {counter: getattr(stat, counter) for counter in main.PAIR_STAT_COUNTERS}
+
+
+def test_recording_matches_counts_each_one(app, ladder):
+    record_ade_and_bola(ladder)
+    assert ade_bola_counts(app) == ADE_BOLA
+
+
+def test_rebuild_counts_each_match(app, ladder):
+    record_ade_and_bola(ladder)
+    result = app.test_cli_runner().invoke(args=["rebuild-pair-stats"])
+    assert result.exit_code == 0, result.output
+    assert ade_bola_counts(app) == ADE_BOLA
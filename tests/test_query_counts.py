@@ -0,0 +1,42 @@
+"""Statement budgets per view: a view that starts loading rows one at a time (N+1) fails here."""
+import pytest
+
+from conftest import YEAR, recorded_statements
+
+# Most statements each view may run, however long the season's history is
+VIEW_BUDGETS = {
+    "/ladder-games": 13,
+    "/head-to-head?p1=Ade&p2=Bola": 7,
+    "/matches": 3,
+    f"/ladder-games/{YEAR}/days?before=2": 5,
+    "/api/v1/standings": 5,
+    "/api/v1/days/1": 5,
+    "/api/v1/matches": 2,
+    "/api/v1/stats/ppg": 2,
+    "/api/v1/h2h?p1=Ade&p2=Bola": 3,
+}
+
+
+def count_statements(client, url):
+    with recorded_statements() as statements:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(statements)
+
+
+@pytest.mark.parametrize("url", VIEW_BUDGETS)
+def test_view_stays_within_budget(ladder, admin, url):
+    for day in (1, 2):
+        ladder.play_day(day)
+    assert count_statements(admin, url) <= VIEW_BUDGETS[url]
+
+
+@pytest.mark.parametrize("url", VIEW_BUDGETS)
+def test_statements_do_not_grow_with_history(ladder, admin, url):
+    for day in (1, 2):
+        ladder.play_day(day)
+    short_season = count_statements(admin, url)
+    for day in range(3, 9):
+        ladder.play_day(day)
+        ladder.challenge("Bola", "Ade", [(6, 2), (6, 3)], day)
+    assert count_statements(admin, url) == short_season
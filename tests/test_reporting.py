@@ -0,0 +1,34 @@
+"""Chart rendering frees every figure, so a long-running worker's memory stays flat."""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter so the peak RSS belongs to the renders alone
+BENCHMARK = """
+import resource, sys
+import reporting
+stat = {f"Player {i}": 10 - i * 0.5 for i in range(12)}
+series = {f"Player {i}": [day * i for day in range(30)] for i in range(8)}
+def render(count):
+    for i in range(count):
+        if i % 2:
+            reporting.render_stat(stat, "BEST POINTS PER GAME RATIO")
+        else:
+            reporting.render_cwp(series)
+render(25)
+warm = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+render(100)
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(warm, peak, "matplotlib.pyplot" in sys.modules)
+"""
+
+
+def test_rendering_100_charts_keeps_memory_flat():
+    result = subprocess.run([sys.executable, "-c", BENCHMARK], capture_output=True, text=True, cwd=ROOT)
+    assert result.returncode == 0, result.stderr[-2000:]
+    warm, peak, pyplot_loaded = result.stdout.split()
+    # ru_maxrss is in KiB on Linux; one leaked 1920x1200 canvas alone is about 9 MiB
+    assert int(peak) - int(warm) < 32 * 1024
+    assert pyplot_loaded == "False"
@@ -0,0 +1,53 @@
+"""One request loads the season's year, weeks, matches and player roster once, however many stats and
+aggregations read them."""
+from collections import Counter
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import main
+
+
+@contextmanager
+def recorded_row_loads():
+    """Counts the ORM queries inside the block that load whole rows of each model, leaving out eager loads of a
+    relationship of rows already loaded."""
+    loads = Counter()
+
+    def record(state):
+        if not state.is_select or state.is_relationship_load:
+            return
+        for column in state.statement.column_descriptions:
+            if isinstance(column["expr"], type):
+                loads[column["expr"].__name__] += 1
+
+    event.listen(Session, "do_orm_execute", record)
+    try:
+        yield loads
+    finally:
+        event.remove(Session, "do_orm_execute", record)
+
+
+def test_ladder_games_loads_season_once(ladder, admin):
+    for day in range(1, 6):
+        ladder.play_day(day)
+    with recorded_row_loads() as loads:
+        assert admin.get("/ladder-games").status_code == 200
+    assert loads["Year"] == 1
+    assert loads["Week"] == 1
+    assert loads["Match"] == 1
+    assert loads["Player"] == 1
+
+
+def test_stats_share_one_season(ladder):
+    for day in range(1, 6):
+        ladder.play_day(day)
+    with recorded_row_loads() as loads, main.app.test_request_context():
+        for get_stat in (main.get_mpw, main.get_ppg, main.get_wpct, main.get_mlgb):
+            get_stat()
+        main.get_season().aggregate
+        main.get_season().players_by_points
+    assert loads["Year"] <= 1
+    assert loads["Match"] == 1
+    assert loads["Player"] == 1
@@ -0,0 +1,21 @@
+"""Starting the app doesn't load the libraries only the report renderers need."""
+import os
+import subprocess
+import sys
+
+# Libraries only reporting.py may import; loading them at start-up slows every worker boot
+HEAVY_MODULES = ("matplotlib", "numpy", "PIL")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_main_does_not_import_heavy_modules():
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], capture_output=True,
+                            text=True, cwd=ROOT)
+    imported = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            imported.add(line.split("|")[-1].strip())
+    assert "main" in imported, result.stderr[-2000:]
+    heavy = sorted({name.split(".")[0] for name in imported} & set(HEAVY_MODULES))
+    assert not heavy, f"main imports {', '.join(heavy)} at start-up; import them in reporting.py"